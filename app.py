@@ -1,948 +1,2580 @@
-import os
-import uuid
-import mysql.connector
-import pandas as pd 
-from mysql.connector import pooling # Pooling Support
-from dotenv import load_dotenv
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from werkzeug.utils import secure_filename
-from groq import Groq
-from PyPDF2 import PdfReader
-
-# Environment Variables Load
-load_dotenv()
-
-# --- DIRECTORY SETUP ---
-UPLOAD_FOLDER = 'static/uploads/id_docs'    # Photos for user ID
-KNOWLEDGE_FOLDER = 'static/uploads/ai_docs' # AI Files 
-
-
-for folder in [UPLOAD_FOLDER, KNOWLEDGE_FOLDER]:
-    if not os.path.exists(folder):
-        os.makedirs(folder)
-
-app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}}, support_credentials=True)
-
-# --- CONFIGURATION ---
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-# --- DATABASE CONNECTION POOL ---
-db_config = {
-    "host": os.getenv("DB_HOST", "localhost"),
-    "user": os.getenv("DB_USER", "root"),
-    "password": os.getenv("DB_PASSWORD"),
-    "database": "college_db"
-}
-
-# Connection Pool Creation (20 Connections ka set)
-try:
-    db_pool = pooling.MySQLConnectionPool(
-        pool_name="coe_pool",
-        pool_size=20, 
-        pool_reset_session=True,
-        **db_config
-    )
-    print("Database Pool Created Successfully!")
-except Exception as e:
-    print(f"Error creating DB Pool: {e}")
-    db_pool = None
-
-# --- DB CONNECTION HELPER ---
-def get_db_connection():
-    try:
-        if db_pool:
-            return db_pool.get_connection()
-        else:
-            return None
-    except Exception as e:
-        print(f"Pool Exhausted or Error: {e}")
-        return None
-
-# --- AI CONTEXT HELPER ---
-def get_full_context():
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return ""
-        
-        cursor = conn.cursor()
-        cursor.execute("SELECT category, content FROM college_info")
-        info = cursor.fetchall()
-        cursor.execute("SELECT course, year_sem, time_slot, subject, room_no FROM timetable")
-        tt = cursor.fetchall()
-        
-        context = "College Info:\n" + "\n".join([f"{r[0]}: {r[1]}" for r in info])
-        context += "\n\nTimetable 2025-26:\n" + "\n".join([f"{r[0]} {r[1]} - {r[3]} at {r[2]} in {r[4]}" for r in tt])
-        return context
-    except Exception as e:
-        print(f"Context Error: {e}")
-        return ""
-    finally:
-        if conn:
-            conn.close() # Connection wapas pool mein
-
-# --- CHAT AI ROUTE ---
-@app.route('/ask', methods=['POST'])
-def ask_ai():
-    conn = None
-    try:
-        data = request.json
-        user_query = data.get("message", "")
-        user_email = data.get("email")
-        
-        # 1. Context Fetch
-        college_knowledge = get_full_context()
-
-        # 2. AI Query
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": f"You are the COE Assistant. Context: {college_knowledge}"},
-                {"role": "user", "content": user_query}
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-        )
-        answer = chat_completion.choices[0].message.content
-        
-        # 3. History Save  
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO chat_history (user_email, user_query, bot_response) VALUES (%s, %s, %s)", 
-                           (user_email, user_query, answer))
-            conn.commit()
-            
-        return jsonify({"answer": answer})
-    except Exception as e:
-        print(f"AI Error: {e}")
-        return jsonify({"answer": "Error occurred in AI processing."}), 500
-    finally:
-        if conn:
-            conn.close()
-
-# --- AUTH ROUTES ---
-
-@app.route('/register', methods=['POST'])
-def register():
-    data = request.json
-    email = data.get('email').strip()
-    roll = data.get('roll').strip()
-    course = data.get('course')
-
-    # Validation
-    if roll != 'GUEST' and len(roll) < 8:
-        return jsonify({"success": False, "message": "Invalid Roll Number! Minimum 8 digits required."})
-    
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
-        
-        cursor = conn.cursor(dictionary=True)
-
-        # Duplicate Check
-        if roll != 'GUEST':
-            cursor.execute("SELECT * FROM users WHERE roll=%s AND course=%s", (roll, course))
-            if cursor.fetchone():
-                return jsonify({"success": False, "message": f"Roll No {roll} is already registered!"})
-
-        dob = data.get('dob')
-        password = dob.replace("-", "") if dob else "123456"
-        
-        cursor.execute('''INSERT INTO users (email, password, name, dob, roll, course, phone) 
-                          VALUES (%s, %s, %s, %s, %s, %s, %s)''', 
-                       (email, password, data['name'], dob, roll, course, data['phone']))
-        conn.commit()
-        return jsonify({"success": True, "userId": email, "password": password})
-    
-    except mysql.connector.Error as err:
-        if err.errno == 1062:
-            return jsonify({"success": False, "message": "Email already registered!"})
-        return jsonify({"success": False, "message": str(err)})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-
-ADMIN_EMAIL = os.getenv("ADMIN_EMAIL") 
-ADMIN_PASS = os.getenv("ADMIN_PASS")
-
-@app.route('/login', methods=['POST'])
-def login():
-    data = request.json
-    user_id = data.get('userId', '').strip()
-    password = data.get('password', '').strip()
-
-    # Admin Login (No DB required)
-    if user_id == ADMIN_EMAIL and password == ADMIN_PASS:
-        return jsonify({"success": True, "userName": "Administrator", "isAdmin": True})
-
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
-
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM users WHERE email=%s AND password=%s", (user_id, password))
-        user = cursor.fetchone()
-        
-        if user:
-            return jsonify({"success": True, "userName": user[0], "isAdmin": False})
-        return jsonify({"success": False, "message": "Invalid Email or Password!"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)}), 500
-    finally:
-        if conn: conn.close()
-
-@app.route('/forgot_password', methods=['POST'])
-def forgot_password():
-    conn = None
-    try:
-        data = request.json
-        email = data.get('email').strip()
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
-
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT password FROM users WHERE email=%s", (email,))
-        user = cursor.fetchone()
-        
-        if user:
-            return jsonify({"success": True, "password": user['password']})
-        return jsonify({"success": False, "message": "Email not found!"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/forgot_userid', methods=['POST'])
-def forgot_userid():
-    conn = None
-    try:
-        data = request.json
-        name = data.get('name', '').strip().lower()
-        roll = data.get('roll', '').strip().lower()
-        course = data.get('course', '').strip().lower()
-        
-        if not roll or not course:
-            return jsonify({"success": False, "message": "Roll No and Course are required!"})
-
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
-
-        cursor = conn.cursor(dictionary=True)
-        
-        if name:
-            query = "SELECT email FROM users WHERE LOWER(name)=%s AND LOWER(roll)=%s AND LOWER(course)=%s"
-            params = (name, roll, course)
-        else:
-            query = "SELECT email FROM users WHERE LOWER(roll)=%s AND LOWER(course)=%s"
-            params = (roll, course)
-            
-        cursor.execute(query, params)
-        user = cursor.fetchone()
-        
-        if user:
-            return jsonify({"success": True, "userId": user['email']})
-        return jsonify({"success": False, "message": "No matching record found."})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-# --- USER DATA ROUTES ---
-
-@app.route('/history', methods=['POST'])
-def get_user_history():
-    conn = None
-    try:
-        data = request.json
-        user_email = data.get('email')
-        conn = get_db_connection()
-        if not conn: return jsonify([])
-
-        cursor = conn.cursor()
-        cursor.execute("SELECT user_query, bot_response, timestamp FROM chat_history WHERE user_email = %s ORDER BY timestamp DESC", (user_email,))
-        rows = cursor.fetchall()
-        history = [{"user": r[0], "bot": r[1], "time": str(r[2])} for r in rows]
-        return jsonify(history)
-    except Exception:
-        return jsonify([])
-    finally:
-        if conn: conn.close()
-
-@app.route('/get_profile', methods=['POST'])
-def get_profile():
-    conn = None
-    try:
-        data = request.json
-        email = data.get('email')
-        conn = get_db_connection()
-        if not conn: return jsonify({"error": "DB Error"}), 500
-
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT name, roll, course, phone, attendance, internal_grade FROM users WHERE email=%s", (email,))
-        user = cursor.fetchone()
-        
-        if user: return jsonify(user)
-        return jsonify({"error": "User not found"}), 404
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    finally:
-        if conn: conn.close()
-
-@app.route('/update_profile', methods=['POST'])
-def update_profile():
-    conn = None
-    try:
-        data = request.json
-        email = data.get('email')
-        name = data.get('name')
-        roll = data.get('roll')
-        course = data.get('course')
-        phone = data.get('phone')
-
-        if not email:
-            return jsonify({"success": False, "message": "Email is required!"}), 400
-
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
-
-        cursor = conn.cursor()
-        query = """
-            UPDATE users 
-            SET name=%s, roll=%s, course=%s, phone=%s 
-            WHERE email=%s
-        """
-        cursor.execute(query, (name, roll, course, phone, email))
-        conn.commit()
-        
-        if cursor.rowcount > 0:
-            return jsonify({"success": True, "message": "Profile updated successfully!"})
-        else:
-            return jsonify({"success": False, "message": "User not found or no changes made."})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)}), 500
-    finally:
-        if conn: conn.close()
-
-# --- ADMIN ROUTES ---
-
-@app.route('/admin/get_users', methods=['GET'])
-def admin_get_users():
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return jsonify([])
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT name, email, roll, course, phone, dob, attendance, internal_grade FROM users")
-        users = cursor.fetchall()
-        return jsonify(users)
-    except Exception:
-        return jsonify([])
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/update_attendance', methods=['POST'])
-def update_attendance():
-    conn = None
-    try:
-        data = request.json
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute("UPDATE users SET attendance=%s, internal_grade=%s WHERE email=%s", 
-                       (data['attendance'], data['grade'], data['email']))
-        conn.commit()
-        return jsonify({"success": True, "message": "Records updated successfully!"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/delete_user', methods=['POST'])
-def delete_user():
-    conn = None
-    try:
-        data = request.json
-        email = data.get('email')
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM users WHERE email=%s", (email,))
-        conn.commit()
-        return jsonify({"success": True, "message": "User deleted successfully"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-# --- KNOWLEDGE BASE ROUTES ---
-
-@app.route('/admin/upload_knowledge', methods=['POST'])
-def upload_knowledge():
-    conn = None
-    try:
-        if 'file' not in request.files:
-            return jsonify({"success": False, "message": "No file part"})
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({"success": False, "message": "No selected file"})
-
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(KNOWLEDGE_FOLDER, filename)
-        file.save(filepath)
-
-        # Text Extraction
-        text_content = ""
-        if filename.endswith('.pdf'):
-            reader = PdfReader(filepath)
-            for page in reader.pages:
-                text_content += page.extract_text()
-        else:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                text_content = f.read()
-
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-
-        cursor = conn.cursor()
-        cursor.execute("INSERT INTO college_info (category, content) VALUES (%s, %s)", 
-                       (f"Document: {filename}", text_content))
-        conn.commit()
-        return jsonify({"success": True, "message": "File processed and added to AI knowledge!"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/get_knowledge', methods=['GET'])
-def get_knowledge():
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return jsonify([])
-        
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT id, category, SUBSTRING(content, 1, 100) as preview FROM college_info WHERE category LIKE 'Document:%' ORDER BY id DESC")
-        docs = cursor.fetchall()
-        return jsonify(docs)
-    except Exception as e:
-        return jsonify([])
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/delete_knowledge', methods=['POST'])
-def delete_knowledge():
-    conn = None
-    try:
-        data = request.json
-        doc_id = data.get('id')
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM college_info WHERE id=%s", (doc_id,))
-        conn.commit()
-        return jsonify({"success": True, "message": "Knowledge deleted permanently!"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-# --- TIMETABLE ROUTES ---
-
-@app.route('/admin/add_timetable', methods=['POST'])
-def add_timetable():
-    conn = None
-    try:
-        data = request.json
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO timetable (course, year_sem, time_slot, subject, room_no)
-            VALUES (%s, %s, %s, %s, %s)
-        ''', (data['course'], data['year'], data['time'], data['subject'], data['room']))
-        conn.commit()
-        return jsonify({"success": True})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/delete_timetable', methods=['POST'])
-def delete_timetable():
-    conn = None
-    try:
-        data = request.json
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM timetable WHERE id=%s", (data['id'],))
-        conn.commit()
-        return jsonify({"success": True})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/get_timetable', methods=['GET'])
-def get_timetable():
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return jsonify([])
-        
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT id, course, year_sem as year, time_slot as time, subject, room_no as room FROM timetable")
-        timetable = cursor.fetchall()
-        return jsonify(timetable)
-    except Exception:
-        return jsonify([])
-    finally:
-        if conn: conn.close()
-
-# --- RESULTS & MARKS ROUTES ---
-
-@app.route('/admin/add_bulk_marks', methods=['POST'])
-def add_bulk_marks():
-    conn = None
-    try:
-        data = request.json
-        email = data.get('email')
-        results = data.get('results')
-
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT email FROM users WHERE email=%s", (email,))
-        if not cursor.fetchone():
-            return jsonify({"success": False, "message": "User not found!"})
-
-        for item in results:
-            cursor.execute('''
-                INSERT INTO results (email, subject, marks, total_marks)
-                VALUES (%s, %s, %s, %s)
-            ''', (email, item['subject'], item['marks'], item['total']))
-        
-        conn.commit()
-        return jsonify({"success": True})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/get_result', methods=['POST'])
-def get_result():
-    conn = None
-    try:
-        data = request.json
-        email = data.get('email')
-        
-        if not email: return jsonify({"success": False, "message": "Email is required"}), 400
-            
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
-        
-        cursor = conn.cursor(dictionary=True) 
-        cursor.execute("SELECT subject, marks, total_marks FROM results WHERE email=%s", (email,))
-        results = cursor.fetchall()
-        
-        if results:
-            return jsonify({"success": True, "results": results})
-        else:
-            return jsonify({"success": False, "message": "No results found."})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)}), 500
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/get_result_by_roll', methods=['POST'])
-def get_result_by_roll():
-    conn = None
-    try:
-        data = request.json
-        roll = data.get('roll')
-        name_filter = data.get('name', '').strip()
-        course_filter = data.get('course', '').strip()
-
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
-        
-        cursor = conn.cursor(dictionary=True)
-        
-        sql = "SELECT email, name, course, roll FROM users WHERE roll=%s"
-        params = [roll]
-        if name_filter:
-            sql += " AND name LIKE %s"
-            params.append(f"%{name_filter}%")
-        if course_filter:
-            sql += " AND course=%s"
-            params.append(course_filter)
-
-        cursor.execute(sql, tuple(params))
-        user = cursor.fetchone()
-        
-        if not user:
-            return jsonify({"success": False, "message": "Student not found!"})
-
-        cursor.execute("SELECT id, subject, marks, total_marks FROM results WHERE email=%s", (user['email'],))
-        results = cursor.fetchall()
-        
-        return jsonify({
-            "success": True, 
-            "results": results, 
-            "name": user['name'], 
-            "email": user['email'],
-            "course": user['course']
-        })
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/delete_all_marks', methods=['POST'])
-def delete_all_marks():
-    conn = None
-    try:
-        data = request.json
-        email = data.get('email')
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM results WHERE email=%s", (email,))
-        conn.commit()
-        return jsonify({"success": True})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/update_result', methods=['POST'])
-def update_result():
-    conn = None
-    try:
-        data = request.json
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute("UPDATE results SET marks=%s, total_marks=%s WHERE id=%s", 
-                       (data['marks'], data['total'], data['id']))
-        conn.commit()
-        return jsonify({"success": True, "message": "Marks updated successfully"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/delete_result_entry', methods=['POST'])
-def delete_result_entry():
-    conn = None
-    try:
-        data = request.json
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM results WHERE id=%s", (data['id'],))
-        conn.commit()
-        return jsonify({"success": True, "message": "Entry deleted"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-# --- ID CARD ROUTES ---
-
-@app.route('/apply_id', methods=['POST'])
-def apply_id():
-    conn = None
-    try:
-        email = request.form.get('email')
-        name = request.form.get('fullName')
-        roll = request.form.get('rollNo')
-        dept = request.form.get('dept')
-        year = request.form.get('year')
-        father = request.form.get('fatherName')
-        mother = request.form.get('motherName')
-        phone = request.form.get('phone')
-        gender = request.form.get('gender')
-
-        if roll and len(roll.strip()) < 8:
-            return jsonify({"success": False, "message": "Roll Number is Minimum 8 digits!"}), 400
-
-        photo = request.files.get('photo')
-        sign = request.files.get('sign')
-        marksheet = request.files.get('marksheet')
-
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
-        
-        cursor = conn.cursor(dictionary=True)
-
-        # Duplicate Check
-        check_query = "SELECT id FROM id_applications WHERE roll_no = %s AND department = %s AND academic_year = %s"
-        cursor.execute(check_query, (roll, dept, year))
-        if cursor.fetchone():
-            return jsonify({"success": False, "message": f"You already applied for {year}"}), 400
-
-        # File Save
-        photo_fn = secure_filename(f"photo_{roll}_{photo.filename}")
-        sign_fn = secure_filename(f"sign_{roll}_{sign.filename}")
-        mark_fn = secure_filename(f"mark_{roll}_{marksheet.filename}")
-
-        photo.save(os.path.join(UPLOAD_FOLDER, photo_fn))
-        sign.save(os.path.join(UPLOAD_FOLDER, sign_fn))
-        marksheet.save(os.path.join(UPLOAD_FOLDER, mark_fn))
-
-        # Insert DB
-        query = """
-            INSERT INTO id_applications 
-            (email, full_name, roll_no, department, academic_year, father_name, mother_name, phone, gender, photo_path, signature_path, marksheet_path, status) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'Pending')
-        """
-        cursor.execute(query, (email, name, roll, dept, year, father, mother, phone, gender, photo_fn, sign_fn, mark_fn))
-        conn.commit()
-        return jsonify({"success": True, "message": "Application successfully submitted!"})
-
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return jsonify({"success": False, "message": str(e)}), 500
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/get_pending_id_apps', methods=['GET'])
-def get_pending_id_apps():
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return jsonify([])
-        
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT id, full_name as fullName, roll_no as rollNo, 
-                   department as dept, father_name as fatherName, 
-                   mother_name as motherName, photo_path as photo, 
-                   marksheet_path as marksheet, academic_year, phone 
-            FROM id_applications WHERE status='Pending'
-        """)
-        apps = cursor.fetchall()
-        return jsonify(apps)
-    except Exception:
-        return jsonify([])
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/update_id_status', methods=['POST'])
-def update_id_status():
-    conn = None
-    try:
-        data = request.json
-        status, app_id = data.get('status'), data.get('id')
-        unique_id = f"COE-{uuid.uuid4().hex[:6].upper()}" if status == 'Approved' else None
-        
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"})
-        
-        cursor = conn.cursor()
-        cursor.execute("UPDATE id_applications SET status=%s, unique_id=%s WHERE id=%s", (status, unique_id, app_id))
-        conn.commit()
-        return jsonify({"success": True})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-@app.route('/api/get_verified_id', methods=['GET'])
-def get_verified_id():
-    conn = None
-    try:
-        email = request.args.get('email')
-        if not email: return jsonify({"success": False, "message": "Email required"}), 400
-            
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
-        
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM id_applications WHERE email=%s AND status='Approved'", (email,))
-        data = cursor.fetchone()
-        
-        if data:
-            data['success'] = True
-            return jsonify(data)
-        else:
-            return jsonify({"success": False, "message": "ID not approved or found"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)}), 500
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/full_edit_id_app', methods=['POST'])
-def full_edit_id_app():
-    conn = None
-    try:
-        app_id = request.form.get('id')
-        name = request.form.get('fullName')
-        roll = request.form.get('rollNo')
-        father = request.form.get('fatherName')
-        mother = request.form.get('motherName')
-        dept = request.form.get('dept')
-        year = request.form.get('year')
-        phone = request.form.get('phone')
-
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
-        
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE id_applications 
-            SET full_name=%s, roll_no=%s, father_name=%s, mother_name=%s, department=%s, academic_year=%s, phone=%s
-            WHERE id=%s
-        """, (name, roll, father, mother, dept, year, phone, app_id))
-
-        # Check for new files
-        photo = request.files.get('photo')
-        marksheet = request.files.get('marksheet')
-
-        if photo:
-            filename = secure_filename(f"photo_revised_{roll}_{photo.filename}")
-            photo.save(os.path.join(UPLOAD_FOLDER, filename))
-            cursor.execute("UPDATE id_applications SET photo_path=%s WHERE id=%s", (filename, app_id))
-
-        if marksheet:
-            filename = secure_filename(f"mark_revised_{roll}_{marksheet.filename}")
-            marksheet.save(os.path.join(UPLOAD_FOLDER, filename))
-            cursor.execute("UPDATE id_applications SET marksheet_path=%s WHERE id=%s", (filename, app_id))
-
-        conn.commit()
-        return jsonify({"success": True})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)}), 500
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/get_verified_students', methods=['GET'])
-def get_verified_students():
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return jsonify({"error": "DB Busy"}), 503
-        
-        cursor = conn.cursor(dictionary=True)
-        query = "SELECT * FROM id_applications WHERE status = 'Approved' ORDER BY id DESC"
-        cursor.execute(query)
-        students = cursor.fetchall()
-        return jsonify(students)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    finally:
-        if conn: conn.close()
-
-@app.route('/api/get_all_ids', methods=['GET'])
-def get_all_ids():
-    conn = None
-    try:
-        email = request.args.get('email')
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
-        
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM id_applications WHERE email=%s ORDER BY academic_year DESC", (email,))
-        cards = cursor.fetchall()
-        return jsonify({"success": True, "cards": cards})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-# --- BULK IMPORT ROUTES ---
-
-@app.route('/admin/import_bulk_marks', methods=['POST'])
-def import_bulk_marks():
-    if 'file' not in request.files:
-        return jsonify({"success": False, "message": "No file uploaded"})
-    
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({"success": False, "message": "No file selected"})
-
-    conn = None
-    try:
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(file)
-        else:
-            df = pd.read_excel(file, engine='openpyxl')
-
-        df.columns = [str(col).strip().upper() for col in df.columns]
-
-        required = ['ROLL_NO', 'SUBJECT', 'MARKS', 'TOTAL_MARKS']
-        if not all(col in df.columns for col in required):
-            return jsonify({
-                "success": False, 
-                "message": f"Columns missing! Headers must be: {', '.join(required)}"
-            })
-
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
-        
-        cursor = conn.cursor(dictionary=True)
-        count = 0
-
-        for index, row in df.iterrows():
-            roll_raw = str(row['ROLL_NO']).strip()
-            roll = roll_raw.split('.')[0] if '.' in roll_raw else roll_raw
-            
-            cursor.execute("SELECT email FROM users WHERE roll = %s", (roll,))
-            user = cursor.fetchone()
-            
-            if user:
-                sem = str(row.get('SEMESTER', 'N/A'))
-                cursor.execute('''
-                    INSERT INTO results (email, subject, marks, total_marks, semester)
-                    VALUES (%s, %s, %s, %s, %s)
-                ''', (user['email'], row['SUBJECT'], row['MARKS'], row['TOTAL_MARKS'], sem))
-                count += 1
-
-        cursor.execute("INSERT INTO college_info (category, content) VALUES (%s, %s)", 
-                       (f"Document: {file.filename}", f"Bulk marks imported for {count} students."))
-        conn.commit()
-        return jsonify({"success": True, "count": count})
-
-    except Exception as e:
-        print(f"IMPORT ERROR: {str(e)}")
-        return jsonify({"success": False, "message": f"Read Error: {str(e)}"})
-    finally:
-        if conn: conn.close()
-
-@app.route('/admin/clear_all_results_database', methods=['POST'])
-def clear_all_results_database():
-    conn = None
-    try:
-        conn = get_db_connection()
-        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
-        
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM results") 
-        conn.commit()
-        return jsonify({"success": True, "message": "All marks deleted successfully"})
-    except Exception as e:
-        return jsonify({"success": False, "message": str(e)})
-    finally:
-        if conn: conn.close()
-
-
-if __name__ == '__main__':
+import io
+import os
+import re
+import csv
+import gzip
+import hmac
+import json
+import time
+import uuid
+import random
+import sqlite3
+import secrets
+import hashlib
+import tempfile
+import threading
+import mimetypes
+from datetime import datetime, timedelta
+from functools import wraps, lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import mysql.connector
+from mysql.connector import pooling # Pooling Support
+import click
+from cachetools import LRUCache
+from dotenv import load_dotenv
+from flask import Flask, request, jsonify, send_from_directory, abort, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from flask_cors import CORS
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+from werkzeug.security import safe_join
+from werkzeug.middleware.proxy_fix import ProxyFix
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Environment Variables Load
+load_dotenv()
+
+# --- DIRECTORY SETUP ---
+UPLOAD_FOLDER = 'static/uploads/id_docs'    # Photos for user ID
+KNOWLEDGE_FOLDER = 'static/uploads/ai_docs' # AI Files 
+
+
+for folder in [UPLOAD_FOLDER, KNOWLEDGE_FOLDER]:
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+app = Flask(__name__)
+CORS(app, resources={r"/*": {"origins": "*"}}, support_credentials=True)
+
+# nginx / load balancer ke peeche: TRUSTED_PROXIES = kitne proxy hops ke X-Forwarded-* par bharosa karna hai
+# (warna har student ka remote_addr proxy ka IP hoga aur rate limit sab par ek saath lagega)
+TRUSTED_PROXIES = int(os.getenv("TRUSTED_PROXIES", 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES, x_host=TRUSTED_PROXIES)
+
+# --- CONFIGURATION ---
+# Heavy libraries (pandas, openpyxl, PyPDF2, groq) sirf unhi functions ke andar import hoti hain
+# jinhe zaroorat hai, taaki worker / test startup fast rahe -> `python bench_startup.py`
+_groq_client = None
+
+def get_groq_client():
+    """Groq SDK (httpx + pydantic) pehli /ask request par load hota hai."""
+    global _groq_client
+    if _groq_client is None:
+        from groq import Groq
+        _groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return _groq_client
+
+# --- DATABASE CONNECTION POOL ---
+db_config = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD"),
+    "database": "college_db"
+}
+
+# Connection Pool Creation (20 Connections ka set)
+def create_db_pool():
+    try:
+        pool = pooling.MySQLConnectionPool(
+            pool_name="coe_pool",
+            pool_size=20, 
+            pool_reset_session=True,
+            **db_config
+        )
+        print("Database Pool Created Successfully!")
+        return pool
+    except Exception as e:
+        print(f"Error creating DB Pool: {e}")
+        return None
+
+# Pool import par nahi, pehli DB request par banta hai; DB down ho to har request par
+# dobara connect karne ki jagah DB_POOL_RETRY_SECONDS baad retry
+DB_POOL_RETRY_SECONDS = float(os.getenv("DB_POOL_RETRY_SECONDS", 10))
+db_pool = None
+_db_pool_lock = threading.Lock()
+_db_pool_retry_at = 0.0
+
+def get_db_pool():
+    global db_pool, _db_pool_retry_at
+    if db_pool is None and time.monotonic() >= _db_pool_retry_at:
+        with _db_pool_lock:
+            if db_pool is None and time.monotonic() >= _db_pool_retry_at:
+                db_pool = create_db_pool()
+                if db_pool is None:
+                    _db_pool_retry_at = time.monotonic() + DB_POOL_RETRY_SECONDS
+    return db_pool
+
+def reset_db_pool():
+    """Fork ke baad: parent ke MySQL sockets share nahi karne, worker apna pool khud banayega."""
+    global db_pool, _db_pool_retry_at
+    db_pool, _db_pool_retry_at = None, 0.0
+
+def close_db_pool():
+    """Idle pool connections theek se band karo (preload master mein, fork se pehle)."""
+    global db_pool
+    if db_pool:
+        db_pool._remove_connections()
+    db_pool = None
+
+# --- DB CONNECTION HELPER ---
+def get_db_connection():
+    try:
+        pool = get_db_pool()
+        if pool:
+            conn = pool.get_connection()
+            return ProfiledConnection(conn) if QUERY_PROFILING else conn
+        else:
+            return None
+    except Exception as e:
+        print(f"Pool Exhausted or Error: {e}")
+        return None
+
+# --- QUERY PROFILING (har execute ka time, normalized statement ke hisaab se) ---
+# Stats har worker process ke apne hain; /admin/slow_queries usi worker ka report deta hai
+QUERY_PROFILING = os.getenv("QUERY_PROFILING", "1") != "0"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+EXPLAIN_INTERVAL = 600      # ek statement ka EXPLAIN max itne seconds mein ek baar
+QUERY_STATS_MAX = 500       # itne distinct statements ke baad baaki "<other>" mein
+
+query_stats = {}
+query_stats_lock = threading.Lock()
+query_stats_since = datetime.now()
+_explain_pool = None
+_explain_pool_pid = None
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Literals / placeholders -> ?, IN lists ek jaise, whitespace collapse."""
+    sql = re.sub(r"'(?:[^'\\]|\\.)*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = sql.replace("%s", "?")
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(?, ...)", sql)
+    return " ".join(sql.split())
+
+def record_query(statement, elapsed, executed=True):
+    ms = elapsed * 1000
+    with query_stats_lock:
+        stat = query_stats.get(statement)
+        if stat is None:
+            if len(query_stats) >= QUERY_STATS_MAX:
+                statement = "<other>"
+                stat = query_stats.get(statement)
+            if stat is None:
+                stat = query_stats[statement] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "slow": 0,
+                                                 "explain": None, "explained_at": 0.0}
+        if executed:
+            stat["count"] += 1
+            if ms >= SLOW_QUERY_MS: stat["slow"] += 1
+        stat["total_ms"] += ms
+        stat["max_ms"] = max(stat["max_ms"], ms)
+        return stat
+
+def _explain(stat, sql, params):
+    conn = None
+    try:
+        conn = get_db_pool().get_connection()  # raw connection, warna EXPLAIN khud profile hoga
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("EXPLAIN " + sql, params)
+        plan = cursor.fetchall()
+        with query_stats_lock:
+            stat["explain"] = plan
+    except Exception as e:
+        print(f"Explain Error: {e}")
+    finally:
+        if conn: conn.close()
+
+def sample_explain(stat, sql, params):
+    """Slow SELECT ka plan background thread mein (request ka time nahi badhta)."""
+    global _explain_pool, _explain_pool_pid
+    now = time.monotonic()
+    with query_stats_lock:
+        if now - stat["explained_at"] < EXPLAIN_INTERVAL: return
+        stat["explained_at"] = now
+        if _explain_pool_pid != os.getpid():  # fork ke baad naya executor
+            _explain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+            _explain_pool_pid = os.getpid()
+        pool = _explain_pool
+    pool.submit(_explain, stat, sql, params)
+
+class ProfiledCursor:
+    """mysql cursor wrapper: execute / executemany ka time record, fetch time usi statement mein jodta hai."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._statement = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def _timed(self, method, sql, params, *args, **kwargs):
+        self._statement = normalize_sql(sql)
+        t0 = time.perf_counter()
+        try:
+            return method(sql, params, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - t0
+            stat = record_query(self._statement, elapsed)
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                print(f"Slow Query ({elapsed * 1000:.0f} ms): {self._statement[:200]}")
+                if method == self._cursor.execute and sql.lstrip()[:6].upper() == "SELECT":
+                    sample_explain(stat, sql, params)
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        return self._timed(self._cursor.execute, sql, params, *args, **kwargs)
+
+    def executemany(self, sql, seq_params, *args, **kwargs):
+        return self._timed(self._cursor.executemany, sql, seq_params, *args, **kwargs)
+
+    def _fetch(self, method, *args):
+        t0 = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._statement:
+                record_query(self._statement, time.perf_counter() - t0, executed=False)
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size=1):
+        return self._fetch(self._cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+class ProfiledConnection:
+    """Pooled connection ka wrapper; sirf cursor() badalta hai, baaki sab as-is."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs))
+
+def slow_query_report(limit=20, sort="total_ms"):
+    with query_stats_lock:
+        rows = [{"statement": statement, **{k: v for k, v in stat.items() if k != "explained_at"}}
+                for statement, stat in query_stats.items()]
+    for row in rows:
+        row["avg_ms"] = round(row["total_ms"] / row["count"], 2) if row["count"] else 0.0
+        row["total_ms"], row["max_ms"] = round(row["total_ms"], 2), round(row["max_ms"], 2)
+    rows.sort(key=lambda row: row[sort], reverse=True)
+    return rows[:limit]
+
+# --- SHARED CACHE (sab worker processes ke beech) ---
+# REDIS_URL set ho to Redis, warna ek local SQLite file (same machine ke saare workers)
+REDIS_URL = os.getenv("REDIS_URL")
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "coe_shared_cache.sqlite3"))
+CONTEXT_CACHE_TTL = int(os.getenv("CONTEXT_CACHE_TTL", 600))
+
+class SQLiteCache:
+    """JSON values + expiry, WAL mode. Connection har process / thread ka apna."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value FROM cache WHERE key=? AND (expires IS NULL OR expires > ?)",
+                                   (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        self._conn().execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                             (key, json.dumps(value), time.time() + ttl if ttl else None))
+
+    def delete(self, *keys):
+        self._conn().executemany("DELETE FROM cache WHERE key=?", [(key,) for key in keys])
+
+    def incr(self, key, ttl=None):
+        """Atomic counter; ttl sirf pehli increment par lagta hai (fixed window)."""
+        conn, now = self._conn(), time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value, expires FROM cache WHERE key=? AND (expires IS NULL OR expires > ?)",
+                               (key, now)).fetchone()
+            value, expires = (json.loads(row[0]) + 1, row[1]) if row else (1, now + ttl if ttl else None)
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)", (key, str(value), expires))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if random.random() < 0.01:
+            self.purge_expired()
+        return value
+
+    def purge_expired(self):
+        return self._conn().execute("DELETE FROM cache WHERE expires < ?", (time.time(),)).rowcount
+
+class RedisCache:
+    """Same interface, Redis par (multi-host deployment ke liye)."""
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self.client.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, json.dumps(value), ex=ttl)
+
+    def delete(self, *keys):
+        self.client.delete(*keys)
+
+    def incr(self, key, ttl=None):
+        value = self.client.incr(key)
+        if value == 1 and ttl:
+            self.client.expire(key, ttl)
+        return value
+
+    def purge_expired(self):
+        return 0  # Redis khud expire karta hai
+
+shared_cache = RedisCache(REDIS_URL) if REDIS_URL else SQLiteCache(SHARED_CACHE_PATH)
+
+# Cache sirf speed ke liye hai: Redis / SQLite file down ho to read = miss, write / invalidate = log
+def cache_get(key, default=None):
+    try:
+        return shared_cache.get(key)
+    except Exception as e:
+        print(f"Shared Cache Error: {e}")
+        return default
+
+def cache_set(key, value, ttl=None):
+    try:
+        shared_cache.set(key, value, ttl)
+    except Exception as e:
+        print(f"Shared Cache Error: {e}")
+
+def cache_delete(*keys):
+    try:
+        shared_cache.delete(*keys)
+    except Exception as e:
+        print(f"Shared Cache Error: {e}")
+
+# --- UPLOAD STORAGE (streamed, size-limited, content-addressed) ---
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", 10)) * 1024 * 1024   # per file
+UPLOAD_CHUNK_SIZE = 64 * 1024
+ORPHAN_GRACE_SECONDS = int(os.getenv("ORPHAN_GRACE_HOURS", 24)) * 3600
+
+# Poori request ki hard limit (apply_id mein 3 files aati hain)
+app.config['MAX_CONTENT_LENGTH'] = 3 * MAX_UPLOAD_BYTES + 1024 * 1024
+
+# Sirf yahi extensions store hote hain (.html / .svg jaisi files API origin se serve na hon)
+ID_DOC_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".pdf")
+KNOWLEDGE_EXTENSIONS = (".pdf", ".txt")
+
+class UploadTooLarge(RequestEntityTooLarge):
+    description = f"File too large! Maximum size is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+
+class UnsupportedUpload(UnsupportedMediaType):
+    pass
+
+def check_upload(file, allowed):
+    ext = os.path.splitext(secure_filename(file.filename or ""))[1].lower()
+    if ext not in allowed:
+        raise UnsupportedUpload(f"File type not allowed! Allowed: {', '.join(allowed)}")
+    return ext
+
+def store_upload(file, folder, allowed):
+    """Upload ko chunks mein disk par likhta hai aur sath mein sha256 banata hai.
+    Same content dobara aaye to purani file reuse hoti hai. Return: '<sha256><ext>'."""
+    ext = check_upload(file, allowed)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk: break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                out.write(chunk)
+
+        filename = digest.hexdigest() + ext
+        final_path = os.path.join(folder, filename)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+            os.utime(final_path)  # fresh mtime, taaki GC grace period mein rahe
+        else:
+            os.replace(tmp_path, final_path)
+        return filename
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# GC sirf inhi naamon ko chhoota hai: content-hash uploads aur purane full_edit ke "*_revised_*" replacements.
+# Baaki legacy files (upgrade se pehle ke knowledge docs waghera) kabhi delete nahi hoti.
+LEGACY_ORPHAN_RE = re.compile(r"^(photo|mark)_revised_")
+
+def collect_orphan_uploads(dry_run=True):
+    """id_applications / college_info mein jo files refer nahi hoti unhe hatata hai.
+    Grace period se nayi files (in-flight uploads, pending thumbnails) chhod di jaati hain."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return None
+
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(ID_DOC_COLUMNS)} FROM id_applications")
+        id_refs = {value for row in cursor.fetchall() for value in row if value}
+        cursor.execute("SELECT source_file FROM college_info WHERE source_file IS NOT NULL")
+        ai_refs = {row[0] for row in cursor.fetchall()}
+    finally:
+        if conn: conn.close()
+
+    cutoff = time.time() - ORPHAN_GRACE_SECONDS
+    report = {"dry_run": dry_run, "files": [], "bytes": 0}
+    for folder, referenced in ((UPLOAD_FOLDER, id_refs), (KNOWLEDGE_FOLDER, ai_refs)):
+        for entry in os.scandir(folder):
+            if not entry.is_file() or entry.name in referenced:
+                continue
+            if not (HASHED_UPLOAD_RE.match(entry.name) or LEGACY_ORPHAN_RE.match(entry.name)):
+                continue
+            stat = entry.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            report["files"].append(entry.name)
+            report["bytes"] += stat.st_size
+            if not dry_run:
+                os.remove(entry.path)
+    return report
+
+# --- IMAGE PIPELINE (ID card uploads) ---
+# Variant name -> (max side in px, JPEG quality). Column: <kind>_<variant>_path
+IMAGE_VARIANTS = {
+    "display": (600, 82),   # ID card preview / PDF
+    "thumb": (160, 70),     # verification & registry lists
+}
+ID_DOC_KINDS = ("photo", "signature", "marksheet")
+ID_DOC_COLUMNS = [f"{kind}_path" for kind in ID_DOC_KINDS] + \
+                 [f"{kind}_{name}_path" for kind in ID_DOC_KINDS for name in IMAGE_VARIANTS]
+image_pool = ThreadPoolExecutor(max_workers=int(os.getenv("IMAGE_WORKERS", 2)), thread_name_prefix="img")
+
+# Variant column mein "" = file process ho chuki hai par image nahi bani (PDF / corrupt / bomb),
+# taaki rebuild_id_images use baar baar queue na kare. UI "" par original dikhata hai.
+NO_VARIANT = ""
+
+def make_image_variants(filename):
+    """Original upload se resized JPEG variants banata hai. PDF / non-image par har variant NO_VARIANT."""
+    src = os.path.join(UPLOAD_FOLDER, filename)
+    stem = os.path.splitext(filename)[0]
+    variants = {}
+    try:
+        with Image.open(src) as img:
+            img = ImageOps.exif_transpose(img)  # phone photos are often rotated via EXIF
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+
+            for name, (max_side, quality) in IMAGE_VARIANTS.items():
+                out_fn = f"{stem}_{name}.jpg"
+                variants[name] = out_fn
+                if os.path.exists(os.path.join(UPLOAD_FOLDER, out_fn)):
+                    continue  # same content pehle aa chuka hai (content-addressed)
+                variant = img.copy()
+                variant.thumbnail((max_side, max_side), Image.LANCZOS)
+                variant.save(os.path.join(UPLOAD_FOLDER, out_fn), "JPEG",
+                             quality=quality, optimize=True, progressive=True)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        print(f"Image Variant Skipped ({filename}): {e}")
+        return {name: NO_VARIANT for name in IMAGE_VARIANTS}
+    return variants
+
+def process_id_images(app_id, files):
+    """Worker job: files = {"photo": fn, "signature": fn, "marksheet": fn}."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return
+
+        cursor = conn.cursor()
+        for kind, filename in files.items():
+            if not filename: continue
+            try:
+                variants = make_image_variants(filename)
+            except Exception as e:
+                # Ek file ki wajah se baaki files ka kaam na ruke
+                print(f"Image Variant Error ({filename}): {e}")
+                variants = {name: NO_VARIANT for name in IMAGE_VARIANTS}
+
+            # Sirf tab update karo jab original abhi bhi wahi file hai (edit race se bachav)
+            columns = ", ".join(f"{kind}_{name}_path=%s" for name in variants)
+            cursor.execute(f"UPDATE id_applications SET {columns} WHERE id=%s AND {kind}_path=%s",
+                           (*variants.values(), app_id, filename))
+        conn.commit()
+    except Exception as e:
+        print(f"Image Pipeline Error (app {app_id}): {e}")
+    finally:
+        if conn: conn.close()
+
+def queue_id_images(app_id, files):
+    image_pool.submit(process_id_images, app_id, files)
+
+# --- JSON PROVIDER & RESPONSE COMPRESSION ---
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4   # dynamic responses ke liye speed/size ka balance
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "text/html", "text/plain", "text/css", "text/csv",
+    "text/javascript", "application/javascript",
+}
+
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+def _escape_non_ascii(match):
+    # json.dumps(ensure_ascii=True) jaisa: \uXXXX, BMP ke bahar surrogate pair
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return "\\u%04x\\u%04x" % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return "\\u%04x" % code
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson installed ho to usse serialize karta hai, warna Flask ka default.
+    datetime / Decimal abhi bhi Flask ke default() se jaate hain, aur ensure_ascii par
+    non-ASCII \\uXXXX escape hota hai. Output lagbhag same hai, par exact nahi: floats ka
+    exponent form alag hai (1e16 vs 1e+16, 1e-7 vs 1e-07) aur NaN / Infinity null ban jaate hain.
+    Jo orjson encode nahi kar sakta (jaise 64-bit se bade int) woh Flask ke default se jaata hai."""
+
+    def dumps(self, obj, **kwargs):
+        # orjson sirf Flask ke response() wale do formats likhta hai: compact ya indent=2
+        compact = kwargs == {"separators": (",", ":")}
+        if orjson is None or not (compact or kwargs == {"indent": 2}):
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        try:
+            text = orjson.dumps(obj, default=self.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, **kwargs)
+        if self.ensure_ascii and not text.isascii():
+            text = _NON_ASCII_RE.sub(_escape_non_ascii, text)
+        return text
+
+app.json = FastJSONProvider(app)
+
+def compress_body(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+@app.after_request
+def compress_response(response):
+    # Files (send_file), streams, pre-compressed assets aur partial responses ko chhod do
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code not in (200, 201)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if brotli else ["gzip"])
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    response.set_data(compress_body(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+# --- FILE SERVING (uploads & static assets) ---
+ASSET_FOLDER = os.path.join(app.root_path, 'templates', 'static')
+PRECOMPRESSED_ASSETS = ("style.css", "script.js")   # `flask build-assets` se .gz / .br
+ASSET_PAGES = ("index.html",)                        # static pages jinke <link>/<script> build-assets rewrite karta hai
+PUBLIC_ASSET_DIRS = ("images/",)                     # baaki templates/static (jaise database/) public nahi
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+LEGACY_UPLOAD_MAX_AGE = 3600
+
+# Apache mod_xsendfile: USE_X_SENDFILE=1
+# Nginx: X_ACCEL_PREFIX=/protected  +  location /protected/ { internal; alias <app>/static/uploads/; }
+app.config['USE_X_SENDFILE'] = os.getenv("USE_X_SENDFILE", "0") == "1"
+X_ACCEL_PREFIX = os.getenv("X_ACCEL_PREFIX", "").rstrip("/")
+
+HASHED_UPLOAD_RE = re.compile(r"^[0-9a-f]{64}(_[a-z]+)?\.[a-z0-9]+$")
+HASHED_ASSET_RE = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{10})(?P<ext>\.[a-z0-9]+)$")
+_asset_hashes = {}  # name -> (mtime_ns, hash)
+
+def asset_hash(name):
+    path = os.path.join(ASSET_FOLDER, name)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _asset_hashes.get(name)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:10]
+    _asset_hashes[name] = (mtime, digest)
+    return digest
+
+def asset_url(name):
+    """'style.css' -> '/assets/style.<hash>.css' (content badla to URL badlega)."""
+    stem, ext = os.path.splitext(name)
+    return f"/assets/{stem}.{asset_hash(name)}{ext}"
+
+def send_stored_file(directory, filename, accel_path, max_age, immutable=False):
+    """ETag / Last-Modified / Range ke sath file bhejta hai, ya X-Accel-Redirect se nginx ko de deta hai."""
+    if X_ACCEL_PREFIX:
+        path = safe_join(directory, filename)
+        if not path or not os.path.isfile(path): abort(404)
+        response = app.response_class(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{X_ACCEL_PREFIX}/{accel_path}"
+    else:
+        response = send_from_directory(directory, filename, max_age=max_age, conditional=True, etag=True)
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    # Browser content sniff na kare; image / PDF ke alawa sab download ho, inline render nahi
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    mimetype = mimetypes.guess_type(filename)[0] or ''
+    if not (mimetype.startswith('image/') and mimetype != 'image/svg+xml') and mimetype != 'application/pdf':
+        response.headers['Content-Disposition'] = 'attachment'
+    return response
+
+@app.route('/uploads/id_docs/<path:filename>', methods=['GET'])
+def serve_id_doc(filename):
+    # Content-hash naam wali files kabhi badalti nahi
+    immutable = HASHED_UPLOAD_RE.match(filename) is not None
+    max_age = IMMUTABLE_MAX_AGE if immutable else LEGACY_UPLOAD_MAX_AGE
+    return send_stored_file(os.path.abspath(UPLOAD_FOLDER), filename, f"id_docs/{filename}", max_age, immutable)
+
+@app.route('/assets/<path:filename>', methods=['GET'])
+def serve_asset(filename):
+    match = HASHED_ASSET_RE.match(filename)
+    name = f"{match['stem']}{match['ext']}" if match else filename
+    if name not in PRECOMPRESSED_ASSETS and (not name.startswith(PUBLIC_ASSET_DIRS) or ".." in name.split("/")):
+        abort(404)
+    path = safe_join(ASSET_FOLDER, name)
+    if not path or not os.path.isfile(path): abort(404)
+
+    # Purana hash (stale page) -> current file, lekin cache nahi
+    fresh = match is not None and match['hash'] == asset_hash(name)
+
+    served, encoding = name, None
+    if name in PRECOMPRESSED_ASSETS:
+        for enc, suffix in (("br", ".br"), ("gzip", ".gz")):
+            variant = path + suffix
+            if (enc in request.accept_encodings and os.path.isfile(variant)
+                    and os.path.getmtime(variant) >= os.path.getmtime(path)):
+                served, encoding = name + suffix, enc
+                break
+
+    response = send_from_directory(ASSET_FOLDER, served, mimetype=mimetypes.guess_type(name)[0],
+                                   max_age=IMMUTABLE_MAX_AGE if fresh else 0, conditional=True, etag=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if name in PRECOMPRESSED_ASSETS:
+        response.vary.add('Accept-Encoding')
+    if fresh:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+@app.cli.command('build-assets')
+@click.option('--base', default=lambda: os.getenv("ASSET_BASE", "http://127.0.0.1:5000"), show_default="ASSET_BASE",
+              help="API origin jahan /assets serve hota hai (pages ke API_BASE jaisa).")
+def build_assets(base):
+    """style.css / script.js ke pre-compressed (.gz, .br) variants likhta hai aur static pages
+    (index.html) ke tags hashed /assets URLs par point karta hai."""
+    if not brotli:
+        print("brotli not installed, only .gz variants will be written")
+
+    for name in PRECOMPRESSED_ASSETS:
+        path = os.path.join(ASSET_FOLDER, name)
+        with open(path, 'rb') as f:
+            raw = f.read()
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(raw, compresslevel=9, mtime=0))
+        if brotli:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(raw, quality=11))
+        print(f"{name}: {len(raw)} bytes -> {asset_url(name)}")
+
+    # Pages static hi rehte hain (Jinja nahi), isliye hashed URL yahin likh dete hain
+    for page in ASSET_PAGES:
+        path = os.path.join(app.root_path, 'templates', page)
+        with open(path, encoding='utf-8', newline='') as f:
+            html = f.read()
+        for name in PRECOMPRESSED_ASSETS:
+            stem, ext = os.path.splitext(name)
+            pattern = rf'(href|src)="[^"]*?\b{re.escape(stem)}(?:\.[0-9a-f]{{10}})?{re.escape(ext)}"'
+            html = re.sub(pattern, lambda m: f'{m[1]}="{base.rstrip("/")}{asset_url(name)}"', html)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(html)
+        print(f"{page}: asset links updated")
+
+# --- AI CONTEXT HELPER ---
+def get_full_context():
+    """college_info + timetable ka prompt context, shared cache mein (har /ask par DB scan nahi)."""
+    cached = cache_get("ctx:full")
+    if cached is not None:
+        return cached
+    try:
+        return load_full_context()
+    except Exception as e:
+        print(f"Context Error: {e}")
+        return ""
+
+def load_full_context():
+    """DB se context bana ke cache karta hai. DB na mile to DBUnavailable (warmup ko pata chale)."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: raise DBUnavailable()
+        
+        cursor = conn.cursor()
+        cursor.execute("SELECT category, content FROM college_info")
+        info = cursor.fetchall()
+        cursor.execute("SELECT course, year_sem, time_slot, subject, room_no FROM timetable")
+        tt = cursor.fetchall()
+        
+        context = "College Info:\n" + "\n".join([f"{r[0]}: {r[1]}" for r in info])
+        context += "\n\nTimetable 2025-26:\n" + "\n".join([f"{r[0]} {r[1]} - {r[3]} at {r[2]} in {r[4]}" for r in tt])
+        cache_set("ctx:full", context, CONTEXT_CACHE_TTL)
+        return context
+    finally:
+        if conn:
+            conn.close() # Connection wapas pool mein
+
+def invalidate_context():
+    """college_info / timetable badalne par sab workers ka cached context hatao."""
+    cache_delete("ctx:full", "timetable")
+
+# --- CHAT AI ROUTE ---
+@app.route('/ask', methods=['POST'])
+def ask_ai():
+    conn = None
+    try:
+        data = request.json
+        user_query = data.get("message", "")
+        user_email = data.get("email")
+        
+        # 1. Context Fetch
+        college_knowledge = get_full_context()
+
+        # 2. AI Query
+        chat_completion = get_groq_client().chat.completions.create(
+            messages=[
+                {"role": "system", "content": f"You are the COE Assistant. Context: {college_knowledge}"},
+                {"role": "user", "content": user_query}
+            ],
+            model="llama-3.3-70b-versatile",
+            temperature=0.7,
+        )
+        answer = chat_completion.choices[0].message.content
+        
+        # 3. History Save  
+        conn = get_db_connection()
+        if conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO chat_history (user_email, user_query, bot_response) VALUES (%s, %s, %s)", 
+                           (user_email, user_query, answer))
+            conn.commit()
+            
+        return jsonify({"answer": answer})
+    except Exception as e:
+        print(f"AI Error: {e}")
+        return jsonify({"answer": "Error occurred in AI processing."}), 500
+    finally:
+        if conn:
+            conn.close()
+
+# --- AUTH HELPERS (signed tokens, user cache, rate limit) ---
+app.secret_key = os.getenv("SECRET_KEY") or secrets.token_hex(32)
+if not os.getenv("SECRET_KEY"):
+    print("SECRET_KEY not set, login tokens will not survive a restart")
+
+AUTH_TOKEN_MAX_AGE = int(os.getenv("AUTH_TOKEN_HOURS", 12)) * 3600
+token_serializer = URLSafeTimedSerializer(app.secret_key, salt="coe-auth")
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 2048))
+user_cache = LRUCache(maxsize=USER_CACHE_SIZE)
+user_cache_lock = threading.Lock()
+USER_FIELDS = "email, password, name, roll, course, phone, attendance, internal_grade"
+PROFILE_FIELDS = ("name", "roll", "course", "phone", "attendance", "internal_grade")
+
+# bucket -> (max attempts, window seconds), har client IP ke liye.
+# login par sirf failed attempts gine jaate hain (result day par ek NAT ke peeche poora college)
+RATE_LIMITS = {
+    "login": (10, 60),
+    "forgot_password": (5, 300),
+    "forgot_userid": (5, 300),
+}
+
+class DBUnavailable(Exception):
+    pass
+
+def issue_token(email, is_admin=False):
+    return token_serializer.dumps({"email": email, "admin": is_admin})
+
+def request_email(data):
+    """Valid token ho to email usi se (MySQL hit nahi), warna purana body wala email.
+    Galat / expired token (jaise restart ke baad naya SECRET_KEY) par bhi body email chalta hai;
+    body mein email na ho tabhi BadSignature raise hota hai."""
+    header = request.headers.get('Authorization', '')
+    token = header[7:] if header.startswith('Bearer ') else data.get('token')
+    if not token:
+        return data.get('email')
+    try:
+        return token_serializer.loads(token, max_age=AUTH_TOKEN_MAX_AGE)['email']
+    except BadSignature:
+        if data.get('email'):
+            return data['email']
+        raise
+
+def get_user_record(email):
+    """users row LRU cache se; miss par DB. update_profile / delete_user par invalidate hota hai.
+    Har worker ka LRU apna hai, isliye entry ke saath shared generation counter bhi check hota hai."""
+    key = (email or "").lower()
+    generation = cache_get(f"user_gen:{key}", default=False)  # False = cache down, LRU par bharosa nahi
+    with user_cache_lock:
+        entry = user_cache.get(key)
+    if entry is not None and generation is not False and entry[0] == (generation or 0):
+        return entry[1]
+
+    conn = get_db_connection()
+    if not conn: raise DBUnavailable()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"SELECT {USER_FIELDS} FROM users WHERE email=%s", (email,))
+        user = cursor.fetchone()
+    finally:
+        conn.close()
+
+    if user and generation is not False:
+        with user_cache_lock:
+            user_cache[key] = (generation or 0, user)
+    return user
+
+def invalidate_user(email):
+    key = (email or "").lower()
+    with user_cache_lock:
+        user_cache.pop(key, None)
+    try:
+        shared_cache.incr(f"user_gen:{key}")
+    except Exception as e:
+        # DB commit ho chuka hai; doosre workers ki entry tab tak purani reh sakti hai
+        print(f"Shared Cache Error: {e}")
+
+def _failed_attempt(response):
+    return response.status_code == 200 and (response.get_json(silent=True) or {}).get("success") is False
+
+def rate_limit(bucket, failures_only=False):
+    """Fixed window limiter (shared cache counter, sab workers ka total); limit cross hone par 429 + Retry-After.
+    failures_only: sirf {"success": false} wale responses counter badhate hain."""
+    limit, window = RATE_LIMITS[bucket]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            now = time.time()
+            slot = int(now // window)
+            key = f"rl:{bucket}:{request.remote_addr}:{slot}"
+            count_failures = failures_only
+            try:
+                hits = (shared_cache.get(key) or 0) if count_failures else shared_cache.incr(key, ttl=window)
+            except Exception as e:
+                print(f"Rate Limit Cache Error: {e}")  # cache down ho to login band nahi karna
+                hits, count_failures = 0, False
+            if hits > limit or (count_failures and hits >= limit):
+                retry_after = int((slot + 1) * window - now) + 1
+                return jsonify({"success": False, "message": "Too many attempts! Please try again later."}), \
+                       429, {"Retry-After": str(retry_after)}
+
+            if not count_failures:
+                return view(*args, **kwargs)
+            response = app.make_response(view(*args, **kwargs))
+            if _failed_attempt(response):
+                try:
+                    shared_cache.incr(key, ttl=window)
+                except Exception as e:
+                    print(f"Rate Limit Cache Error: {e}")
+            return response
+        return wrapper
+    return decorator
+
+# --- AUTH ROUTES ---
+
+@app.route('/register', methods=['POST'])
+def register():
+    data = request.json
+    email = data.get('email').strip()
+    roll = data.get('roll').strip()
+    course = data.get('course')
+
+    # Validation
+    if roll != 'GUEST' and len(roll) < 8:
+        return jsonify({"success": False, "message": "Invalid Roll Number! Minimum 8 digits required."})
+    
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
+        
+        cursor = conn.cursor(dictionary=True)
+
+        # Duplicate Check
+        if roll != 'GUEST':
+            cursor.execute("SELECT * FROM users WHERE roll=%s AND course=%s", (roll, course))
+            if cursor.fetchone():
+                return jsonify({"success": False, "message": f"Roll No {roll} is already registered!"})
+
+        dob = data.get('dob')
+        password = dob.replace("-", "") if dob else "123456"
+        
+        cursor.execute('''INSERT INTO users (email, password, name, dob, roll, course, phone) 
+                          VALUES (%s, %s, %s, %s, %s, %s, %s)''', 
+                       (email, password, data['name'], dob, roll, course, data['phone']))
+        conn.commit()
+        return jsonify({"success": True, "userId": email, "password": password})
+    
+    except mysql.connector.Error as err:
+        if err.errno == 1062:
+            return jsonify({"success": False, "message": "Email already registered!"})
+        return jsonify({"success": False, "message": str(err)})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+
+ADMIN_EMAIL = os.getenv("ADMIN_EMAIL") 
+ADMIN_PASS = os.getenv("ADMIN_PASS")
+
+@app.route('/login', methods=['POST'])
+@rate_limit("login", failures_only=True)
+def login():
+    data = request.json
+    user_id = data.get('userId', '').strip()
+    password = data.get('password', '').strip()
+
+    # Admin Login (No DB required)
+    if user_id == ADMIN_EMAIL and password == ADMIN_PASS:
+        return jsonify({"success": True, "userName": "Administrator", "isAdmin": True,
+                        "token": issue_token(user_id, is_admin=True)})
+
+    try:
+        user = get_user_record(user_id)
+        # bytes compare: str par compare_digest non-ASCII password par TypeError deta hai
+        if user and hmac.compare_digest(user['password'].encode('utf-8'), password.encode('utf-8')):
+            return jsonify({"success": True, "userName": user['name'], "isAdmin": False,
+                            "token": issue_token(user['email'])})
+        return jsonify({"success": False, "message": "Invalid Email or Password!"})
+    except DBUnavailable:
+        return jsonify({"success": False, "message": "Server Busy"}), 503
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@app.route('/forgot_password', methods=['POST'])
+@rate_limit("forgot_password")
+def forgot_password():
+    conn = None
+    try:
+        data = request.json
+        email = data.get('email').strip()
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
+
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT password FROM users WHERE email=%s", (email,))
+        user = cursor.fetchone()
+        
+        if user:
+            return jsonify({"success": True, "password": user['password']})
+        return jsonify({"success": False, "message": "Email not found!"})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/forgot_userid', methods=['POST'])
+@rate_limit("forgot_userid")
+def forgot_userid():
+    conn = None
+    try:
+        data = request.json
+        name = data.get('name', '').strip()
+        roll = data.get('roll', '').strip()
+        course = data.get('course', '').strip()
+        
+        if not roll or not course:
+            return jsonify({"success": False, "message": "Roll No and Course are required!"})
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
+
+        cursor = conn.cursor(dictionary=True)
+        
+        # Column collation (utf8mb4_0900_ai_ci) already case-insensitive hai, LOWER() se index use nahi hota
+        if name:
+            query = "SELECT email FROM users WHERE roll=%s AND course=%s AND name=%s"
+            params = (roll, course, name)
+        else:
+            query = "SELECT email FROM users WHERE roll=%s AND course=%s"
+            params = (roll, course)
+            
+        cursor.execute(query, params)
+        user = cursor.fetchone()
+        
+        if user:
+            return jsonify({"success": True, "userId": user['email']})
+        return jsonify({"success": False, "message": "No matching record found."})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+# --- USER DATA ROUTES ---
+
+@app.route('/history', methods=['POST'])
+def get_user_history():
+    conn = None
+    try:
+        data = request.json
+        user_email = request_email(data)
+        conn = get_db_connection()
+        if not conn: return jsonify([])
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_query, bot_response, timestamp FROM chat_history WHERE user_email = %s ORDER BY timestamp DESC", (user_email,))
+        rows = cursor.fetchall()
+        history = [{"user": r[0], "bot": r[1], "time": str(r[2])} for r in rows]
+        return jsonify(history)
+    except BadSignature:
+        return jsonify({"error": "Session expired, please login again"}), 401
+    except Exception:
+        return jsonify([])
+    finally:
+        if conn: conn.close()
+
+@app.route('/get_profile', methods=['POST'])
+def get_profile():
+    try:
+        data = request.json
+        user = get_user_record(request_email(data))
+        
+        if user: return jsonify({field: user[field] for field in PROFILE_FIELDS})
+        return jsonify({"error": "User not found"}), 404
+    except BadSignature:
+        return jsonify({"error": "Session expired, please login again"}), 401
+    except DBUnavailable:
+        return jsonify({"error": "DB Error"}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/update_profile', methods=['POST'])
+def update_profile():
+    conn = None
+    try:
+        data = request.json
+        email = data.get('email')
+        name = data.get('name')
+        roll = data.get('roll')
+        course = data.get('course')
+        phone = data.get('phone')
+
+        if not email:
+            return jsonify({"success": False, "message": "Email is required!"}), 400
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "Server Busy"}), 503
+
+        cursor = conn.cursor()
+        groups = _course_groups(cursor, [email])   # course badla to purani class ka aggregate bhi
+        query = """
+            UPDATE users 
+            SET name=%s, roll=%s, course=%s, phone=%s 
+            WHERE email=%s
+        """
+        cursor.execute(query, (name, roll, course, phone, email))
+        updated = cursor.rowcount
+        if updated > 0:
+            refresh_course_summary(cursor, groups | _course_groups(cursor, [email]))
+        conn.commit()
+        invalidate_user(email)
+        
+        if updated > 0:
+            return jsonify({"success": True, "message": "Profile updated successfully!"})
+        else:
+            return jsonify({"success": False, "message": "User not found or no changes made."})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        if conn: conn.close()
+
+# --- ADMIN ROUTES ---
+
+@app.route('/admin/get_users', methods=['GET'])
+def admin_get_users():
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return jsonify([])
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT name, email, roll, course, phone, dob, attendance, internal_grade FROM users")
+        users = cursor.fetchall()
+        return jsonify(users)
+    except Exception:
+        return jsonify([])
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/update_attendance', methods=['POST'])
+def update_attendance():
+    conn = None
+    try:
+        data = request.json
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        cursor.execute("UPDATE users SET attendance=%s, internal_grade=%s WHERE email=%s", 
+                       (data['attendance'], data['grade'], data['email']))
+        conn.commit()
+        invalidate_user(data['email'])
+        return jsonify({"success": True, "message": "Records updated successfully!"})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/delete_user', methods=['POST'])
+def delete_user():
+    conn = None
+    try:
+        data = request.json
+        email = data.get('email')
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        groups = _course_groups(cursor, [email])   # FK cascade result_summary rows hata deta hai
+        cursor.execute("DELETE FROM users WHERE email=%s", (email,))
+        refresh_course_summary(cursor, groups)
+        conn.commit()
+        invalidate_user(email)
+        return jsonify({"success": True, "message": "User deleted successfully"})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+# --- KNOWLEDGE BASE ROUTES ---
+
+@app.route('/admin/upload_knowledge', methods=['POST'])
+def upload_knowledge():
+    conn = None
+    try:
+        if 'file' not in request.files:
+            return jsonify({"success": False, "message": "No file part"})
+        
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({"success": False, "message": "No selected file"})
+
+        filename = secure_filename(file.filename)
+        stored_fn = store_upload(file, KNOWLEDGE_FOLDER, KNOWLEDGE_EXTENSIONS)
+        filepath = os.path.join(KNOWLEDGE_FOLDER, stored_fn)
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT category FROM college_info WHERE source_file=%s LIMIT 1", (stored_fn,))
+        existing = cursor.fetchone()
+        if existing:
+            return jsonify({"success": False, "message": f"Same file already added as '{existing[0]}'"})
+
+        # Text Extraction
+        text_content = ""
+        if stored_fn.endswith('.pdf'):
+            from PyPDF2 import PdfReader
+            reader = PdfReader(filepath)
+            for page in reader.pages:
+                text_content += page.extract_text()
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                text_content = f.read()
+
+        cursor.execute("INSERT INTO college_info (category, content, source_file) VALUES (%s, %s, %s)", 
+                       (f"Document: {filename}", text_content, stored_fn))
+        conn.commit()
+        invalidate_context()
+        return jsonify({"success": True, "message": "File processed and added to AI knowledge!"})
+    except (RequestEntityTooLarge, UnsupportedMediaType) as e:
+        return jsonify({"success": False, "message": e.description}), e.code
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/get_knowledge', methods=['GET'])
+def get_knowledge():
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return jsonify([])
+        
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT id, category, SUBSTRING(content, 1, 100) as preview FROM college_info WHERE category LIKE 'Document:%' ORDER BY id DESC")
+        docs = cursor.fetchall()
+        return jsonify(docs)
+    except Exception as e:
+        return jsonify([])
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/delete_knowledge', methods=['POST'])
+def delete_knowledge():
+    conn = None
+    try:
+        data = request.json
+        doc_id = data.get('id')
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM college_info WHERE id=%s", (doc_id,))
+        conn.commit()
+        invalidate_context()
+        return jsonify({"success": True, "message": "Knowledge deleted permanently!"})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+# --- TIMETABLE ROUTES ---
+
+@app.route('/admin/add_timetable', methods=['POST'])
+def add_timetable():
+    conn = None
+    try:
+        data = request.json
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO timetable (course, year_sem, time_slot, subject, room_no)
+            VALUES (%s, %s, %s, %s, %s)
+        ''', (data['course'], data['year'], data['time'], data['subject'], data['room']))
+        conn.commit()
+        invalidate_context()
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/delete_timetable', methods=['POST'])
+def delete_timetable():
+    conn = None
+    try:
+        data = request.json
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM timetable WHERE id=%s", (data['id'],))
+        conn.commit()
+        invalidate_context()
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+def load_timetable(refresh=False):
+    if not refresh:
+        cached = cache_get("timetable")
+        if cached is not None:
+            return cached
+
+    conn = get_db_connection()
+    if not conn: raise DBUnavailable()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT id, course, year_sem as year, time_slot as time, subject, room_no as room FROM timetable")
+        timetable = cursor.fetchall()
+        cache_set("timetable", timetable, CONTEXT_CACHE_TTL)
+        return timetable
+    finally:
+        conn.close()
+
+@app.route('/get_timetable', methods=['GET'])
+def get_timetable():
+    try:
+        return jsonify(load_timetable())
+    except Exception:
+        return jsonify([])
+
+# --- RESULT AGGREGATES ---
+PASS_PERCENTAGE = float(os.getenv("PASS_PERCENTAGE", 33))
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+def _course_groups(cursor, emails):
+    cursor.execute(f"""
+        SELECT DISTINCT COALESCE(u.course, 'N/A'), s.semester FROM result_summary s
+        JOIN users u ON u.email = s.email WHERE s.email IN ({_placeholders(emails)})
+    """, tuple(emails))
+    return set(cursor.fetchall())
+
+def refresh_result_summary(conn, emails):
+    """Diye gaye students ki result_summary rows aur unke course/semester ki course_summary
+    results table se dobara banata hai. Caller ki transaction mein chalta hai (commit caller karega)."""
+    emails = sorted({e for e in emails if e})
+    if not emails: return
+
+    cursor = conn.cursor()
+    try:
+        groups = _course_groups(cursor, emails)   # delete se pehle wale groups bhi refresh hone chahiye
+        cursor.execute(f"DELETE FROM result_summary WHERE email IN ({_placeholders(emails)})", tuple(emails))
+        cursor.execute(f"""
+            INSERT INTO result_summary (email, semester, subjects, passed_subjects, obtained, total, percentage)
+            SELECT email, COALESCE(semester, 'N/A'), COUNT(*), SUM(marks * 100 >= total_marks * %s),
+                   SUM(marks), SUM(total_marks), COALESCE(ROUND(SUM(marks) * 100 / NULLIF(SUM(total_marks), 0), 2), 0)
+            FROM results WHERE email IN ({_placeholders(emails)})
+            GROUP BY email, COALESCE(semester, 'N/A')
+        """, (PASS_PERCENTAGE, *emails))
+        groups |= _course_groups(cursor, emails)
+        refresh_course_summary(cursor, groups)
+    finally:
+        cursor.close()
+
+def refresh_course_summary(cursor, groups):
+    """(course, semester) groups ki course_summary rows result_summary se dobara. Khali group ki row hat jaati hai."""
+    for course, semester in groups:
+        cursor.execute("DELETE FROM course_summary WHERE course=%s AND semester=%s", (course, semester))
+        cursor.execute("""
+            INSERT INTO course_summary (course, semester, students, passed_students,
+                                        avg_percentage, max_percentage, min_percentage)
+            SELECT %s, s.semester, COUNT(*), SUM(s.passed_subjects = s.subjects),
+                   ROUND(AVG(s.percentage), 2), MAX(s.percentage), MIN(s.percentage)
+            FROM result_summary s JOIN users u ON u.email = s.email
+            WHERE COALESCE(u.course, 'N/A') = %s AND s.semester = %s
+            GROUP BY s.semester
+        """, (course, course, semester))
+
+def recompute_all_summaries(conn):
+    """Full rebuild: results ek baar padh ke pandas groupby se dono summary tables."""
+    import pandas as pd
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT r.email, COALESCE(r.semester, 'N/A'), r.marks, r.total_marks, COALESCE(u.course, 'N/A')
+            FROM results r JOIN users u ON u.email = r.email
+        """)
+        df = pd.DataFrame(cursor.fetchall(), columns=['email', 'semester', 'marks', 'total_marks', 'course'])
+        df['passed'] = df['marks'] * 100 >= df['total_marks'] * PASS_PERCENTAGE
+
+        student = df.groupby(['email', 'semester', 'course'], as_index=False).agg(
+            subjects=('marks', 'size'), passed_subjects=('passed', 'sum'),
+            obtained=('marks', 'sum'), total=('total_marks', 'sum'))
+        student['percentage'] = (student['obtained'] * 100 / student['total'].where(student['total'] > 0)).round(2).fillna(0)
+
+        course = student.assign(all_passed=student['passed_subjects'] == student['subjects']) \
+            .groupby(['course', 'semester'], as_index=False).agg(
+                students=('email', 'size'), passed_students=('all_passed', 'sum'),
+                avg_percentage=('percentage', 'mean'), max_percentage=('percentage', 'max'),
+                min_percentage=('percentage', 'min'))
+        course['avg_percentage'] = course['avg_percentage'].round(2)
+
+        student_cols = ['email', 'semester', 'subjects', 'passed_subjects', 'obtained', 'total', 'percentage']
+        course_cols = ['course', 'semester', 'students', 'passed_students', 'avg_percentage', 'max_percentage', 'min_percentage']
+
+        cursor.execute("DELETE FROM result_summary")
+        cursor.execute("DELETE FROM course_summary")
+        cursor.executemany(f"INSERT INTO result_summary ({', '.join(student_cols)}) VALUES ({_placeholders(student_cols)})",
+                           student[student_cols].astype(object).values.tolist())
+        cursor.executemany(f"INSERT INTO course_summary ({', '.join(course_cols)}) VALUES ({_placeholders(course_cols)})",
+                           course[course_cols].astype(object).values.tolist())
+        conn.commit()
+        return {"students": len(student), "groups": len(course)}
+    finally:
+        cursor.close()
+
+def student_summary(cursor, email):
+    """Semester-wise totals + course mein rank / percentile (result_summary se)."""
+    cursor.execute("""
+        SELECT semester, subjects, passed_subjects, obtained, total, percentage, rank_no, percentile FROM (
+            SELECT s.*, RANK() OVER (PARTITION BY s.semester ORDER BY s.percentage DESC) AS rank_no,
+                   ROUND(PERCENT_RANK() OVER (PARTITION BY s.semester ORDER BY s.percentage) * 100, 2) AS percentile
+            FROM result_summary s JOIN users u ON u.email = s.email
+            WHERE u.course = (SELECT course FROM users WHERE email = %s)
+        ) ranked WHERE email = %s ORDER BY semester
+    """, (email, email))
+    return cursor.fetchall()
+
+# --- RESULTS & MARKS ROUTES ---
+
+@app.route('/admin/add_bulk_marks', methods=['POST'])
+def add_bulk_marks():
+    conn = None
+    try:
+        data = request.json
+        email = data.get('email')
+        results = data.get('results')
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT email FROM users WHERE email=%s", (email,))
+        if not cursor.fetchone():
+            return jsonify({"success": False, "message": "User not found!"})
+
+        for item in results:
+            cursor.execute('''
+                INSERT INTO results (email, subject, marks, total_marks)
+                VALUES (%s, %s, %s, %s)
+            ''', (email, item['subject'], item['marks'], item['total']))
+        
+        refresh_result_summary(conn, [email])
+        conn.commit()
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/get_result', methods=['POST'])
+def get_result():
+    conn = None
+    try:
+        data = request.json
+        email = request_email(data)
+        
+        if not email: return jsonify({"success": False, "message": "Email is required"}), 400
+            
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+        
+        cursor = conn.cursor(dictionary=True) 
+        cursor.execute("SELECT subject, marks, total_marks FROM results WHERE email=%s", (email,))
+        results = cursor.fetchall()
+        
+        if results:
+            return jsonify({"success": True, "results": results, "summary": student_summary(cursor, email)})
+        else:
+            return jsonify({"success": False, "message": "No results found."})
+    except BadSignature:
+        return jsonify({"success": False, "message": "Session expired, please login again"}), 401
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/get_result_by_roll', methods=['POST'])
+def get_result_by_roll():
+    conn = None
+    try:
+        data = request.json
+        roll = data.get('roll')
+        name_filter = data.get('name', '').strip()
+        course_filter = data.get('course', '').strip()
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+        
+        cursor = conn.cursor(dictionary=True)
+        
+        sql = "SELECT email, name, course, roll FROM users WHERE roll=%s"
+        params = [roll]
+        if name_filter:
+            sql += " AND name LIKE %s"
+            params.append(f"%{name_filter}%")
+        if course_filter:
+            sql += " AND course=%s"
+            params.append(course_filter)
+
+        cursor.execute(sql, tuple(params))
+        user = cursor.fetchone()
+        
+        if not user:
+            return jsonify({"success": False, "message": "Student not found!"})
+
+        cursor.execute("SELECT id, subject, marks, total_marks FROM results WHERE email=%s", (user['email'],))
+        results = cursor.fetchall()
+        
+        return jsonify({
+            "success": True, 
+            "results": results, 
+            "name": user['name'], 
+            "email": user['email'],
+            "course": user['course'],
+            "summary": student_summary(cursor, user['email'])
+        })
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/delete_all_marks', methods=['POST'])
+def delete_all_marks():
+    conn = None
+    try:
+        data = request.json
+        email = data.get('email')
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM results WHERE email=%s", (email,))
+        refresh_result_summary(conn, [email])
+        conn.commit()
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/update_result', methods=['POST'])
+def update_result():
+    conn = None
+    try:
+        data = request.json
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        cursor.execute("UPDATE results SET marks=%s, total_marks=%s WHERE id=%s", 
+                       (data['marks'], data['total'], data['id']))
+        cursor.execute("SELECT email FROM results WHERE id=%s", (data['id'],))
+        row = cursor.fetchone()
+        if row: refresh_result_summary(conn, [row[0]])
+        conn.commit()
+        return jsonify({"success": True, "message": "Marks updated successfully"})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/delete_result_entry', methods=['POST'])
+def delete_result_entry():
+    conn = None
+    try:
+        data = request.json
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        cursor = conn.cursor()
+        cursor.execute("SELECT email FROM results WHERE id=%s", (data['id'],))
+        row = cursor.fetchone()
+        cursor.execute("DELETE FROM results WHERE id=%s", (data['id'],))
+        if row: refresh_result_summary(conn, [row[0]])
+        conn.commit()
+        return jsonify({"success": True, "message": "Entry deleted"})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+# --- ID STATUS HELPERS ---
+ID_STATUSES = ('Approved', 'Rejected')
+BULK_STATUS_LIMIT = 1000
+UNIQUE_ID_RETRIES = 3
+
+def allocate_unique_ids(cursor, count):
+    """count naye COE-XXXXXX IDs. Candidates batch mein banake ek IN query se existing check."""
+    allocated = set()
+    while len(allocated) < count:
+        candidates = {f"COE-{uuid.uuid4().hex[:6].upper()}" for _ in range(count - len(allocated))}
+        candidates -= allocated
+        placeholders = ", ".join(["%s"] * len(candidates))
+        cursor.execute(f"SELECT unique_id FROM id_applications WHERE unique_id IN ({placeholders})",
+                       tuple(candidates))
+        taken = {row[0] for row in cursor.fetchall()}
+        allocated |= candidates - taken
+    return list(allocated)
+
+def set_id_status(conn, app_ids, status):
+    """Ek transaction mein status update. Approved rows ko unique_id milti hai (pehle se ho to wahi rehti hai).
+    Return: {app_id: unique_id}, sirf un IDs ka jo table mein mile."""
+    placeholders = ", ".join(["%s"] * len(app_ids))
+    for attempt in range(UNIQUE_ID_RETRIES):
+        cursor = conn.cursor()
+        try:
+            if status != 'Approved':
+                cursor.execute(f"SELECT id FROM id_applications WHERE id IN ({placeholders}) FOR UPDATE", tuple(app_ids))
+                found = [row[0] for row in cursor.fetchall()]
+                if found:
+                    cursor.execute(f"UPDATE id_applications SET status=%s, unique_id=NULL WHERE id IN ({_placeholders(found)})",
+                                   (status, *found))
+                conn.commit()
+                return {app_id: None for app_id in found}
+
+            cursor.execute(f"SELECT id, unique_id FROM id_applications WHERE id IN ({placeholders}) FOR UPDATE",
+                           tuple(app_ids))
+            rows = cursor.fetchall()
+            fresh_ids = iter(allocate_unique_ids(cursor, sum(1 for _, uid in rows if not uid)))
+            assigned = {app_id: uid or next(fresh_ids) for app_id, uid in rows}
+
+            cursor.executemany("UPDATE id_applications SET status='Approved', unique_id=%s WHERE id=%s",
+                               [(uid, app_id) for app_id, uid in assigned.items()])
+            conn.commit()
+            return assigned
+        except mysql.connector.Error as err:
+            conn.rollback()
+            # 1062: doosri request ne wahi ID le li (unique index), dobara try
+            if err.errno != 1062 or attempt == UNIQUE_ID_RETRIES - 1:
+                raise
+        finally:
+            cursor.close()
+
+# --- ID CARD ROUTES ---
+
+@app.route('/apply_id', methods=['POST'])
+def apply_id():
+    conn = None
+    try:
+        email = request.form.get('email')
+        name = request.form.get('fullName')
+        roll = request.form.get('rollNo')
+        dept = request.form.get('dept')
+        year = request.form.get('year')
+        father = request.form.get('fatherName')
+        mother = request.form.get('motherName')
+        phone = request.form.get('phone')
+        gender = request.form.get('gender')
+
+        if roll and len(roll.strip()) < 8:
+            return jsonify({"success": False, "message": "Roll Number is Minimum 8 digits!"}), 400
+
+        photo = request.files.get('photo')
+        sign = request.files.get('sign')
+        marksheet = request.files.get('marksheet')
+        for upload in (photo, sign, marksheet):
+            if not upload: return jsonify({"success": False, "message": "Photo, signature and marksheet are required!"}), 400
+            check_upload(upload, ID_DOC_EXTENSIONS)
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+        
+        cursor = conn.cursor(dictionary=True)
+
+        # Duplicate Check
+        check_query = "SELECT id FROM id_applications WHERE roll_no = %s AND department = %s AND academic_year = %s"
+        cursor.execute(check_query, (roll, dept, year))
+        if cursor.fetchone():
+            return jsonify({"success": False, "message": f"You already applied for {year}"}), 400
+
+        # File Save (content hash naam, duplicate uploads ek hi copy)
+        photo_fn = store_upload(photo, UPLOAD_FOLDER, ID_DOC_EXTENSIONS)
+        sign_fn = store_upload(sign, UPLOAD_FOLDER, ID_DOC_EXTENSIONS)
+        mark_fn = store_upload(marksheet, UPLOAD_FOLDER, ID_DOC_EXTENSIONS)
+
+        # Insert DB
+        query = """
+            INSERT INTO id_applications 
+            (email, full_name, roll_no, department, academic_year, father_name, mother_name, phone, gender, photo_path, signature_path, marksheet_path, status) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'Pending')
+        """
+        cursor.execute(query, (email, name, roll, dept, year, father, mother, phone, gender, photo_fn, sign_fn, mark_fn))
+        conn.commit()
+
+        # Thumbnails / display copies background mein banenge
+        queue_id_images(cursor.lastrowid, {"photo": photo_fn, "signature": sign_fn, "marksheet": mark_fn})
+        return jsonify({"success": True, "message": "Application successfully submitted!"})
+
+    except (RequestEntityTooLarge, UnsupportedMediaType) as e:
+        return jsonify({"success": False, "message": e.description}), e.code
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/get_pending_id_apps', methods=['GET'])
+def get_pending_id_apps():
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return jsonify([])
+        
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, full_name as fullName, roll_no as rollNo, 
+                   department as dept, father_name as fatherName, 
+                   mother_name as motherName, photo_path as photo, 
+                   photo_thumb_path as photoThumb,
+                   marksheet_path as marksheet, academic_year, phone 
+            FROM id_applications WHERE status='Pending'
+        """)
+        apps = cursor.fetchall()
+        return jsonify(apps)
+    except Exception:
+        return jsonify([])
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/update_id_status', methods=['POST'])
+def update_id_status():
+    conn = None
+    try:
+        data = request.json
+        status, app_id = data.get('status'), int(data.get('id'))
+        if status not in ID_STATUSES:
+            return jsonify({"success": False, "message": "Status must be Approved or Rejected"}), 400
+        
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"})
+        
+        assigned = set_id_status(conn, [app_id], status)
+        if app_id not in assigned:
+            return jsonify({"success": False, "message": "Application not found"}), 404
+        return jsonify({"success": True, "unique_id": assigned.get(app_id)})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/bulk_update_id_status', methods=['POST'])
+def bulk_update_id_status():
+    conn = None
+    try:
+        data = request.json
+        status = data.get('status')
+        app_ids = sorted({int(i) for i in data.get('ids', [])})
+
+        if status not in ID_STATUSES:
+            return jsonify({"success": False, "message": "Status must be Approved or Rejected"}), 400
+        if not app_ids:
+            return jsonify({"success": False, "message": "No applications selected"}), 400
+        if len(app_ids) > BULK_STATUS_LIMIT:
+            return jsonify({"success": False, "message": f"Maximum {BULK_STATUS_LIMIT} applications at once"}), 400
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+
+        assigned = set_id_status(conn, app_ids, status)
+        return jsonify({"success": True, "updated": len(assigned), "ids": assigned})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/api/get_verified_id', methods=['GET'])
+def get_verified_id():
+    conn = None
+    try:
+        email = request.args.get('email')
+        if not email: return jsonify({"success": False, "message": "Email required"}), 400
+            
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+        
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM id_applications WHERE email=%s AND status='Approved'", (email,))
+        data = cursor.fetchone()
+        
+        if data:
+            data['success'] = True
+            return jsonify(data)
+        else:
+            return jsonify({"success": False, "message": "ID not approved or found"})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/full_edit_id_app', methods=['POST'])
+def full_edit_id_app():
+    conn = None
+    try:
+        app_id = request.form.get('id')
+        name = request.form.get('fullName')
+        roll = request.form.get('rollNo')
+        father = request.form.get('fatherName')
+        mother = request.form.get('motherName')
+        dept = request.form.get('dept')
+        year = request.form.get('year')
+        phone = request.form.get('phone')
+
+        # Check for new files
+        photo = request.files.get('photo')
+        marksheet = request.files.get('marksheet')
+        for upload in (photo, marksheet):
+            if upload: check_upload(upload, ID_DOC_EXTENSIONS)
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+        
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE id_applications 
+            SET full_name=%s, roll_no=%s, father_name=%s, mother_name=%s, department=%s, academic_year=%s, phone=%s
+            WHERE id=%s
+        """, (name, roll, father, mother, dept, year, phone, app_id))
+
+        new_files = {}
+
+        # Purane variants clear; worker naye bana dega tab tak list original dikhayegi
+        if photo:
+            filename = store_upload(photo, UPLOAD_FOLDER, ID_DOC_EXTENSIONS)
+            cursor.execute("""
+                UPDATE id_applications
+                SET photo_path=%s, photo_display_path=NULL, photo_thumb_path=NULL
+                WHERE id=%s
+            """, (filename, app_id))
+            new_files["photo"] = filename
+
+        if marksheet:
+            filename = store_upload(marksheet, UPLOAD_FOLDER, ID_DOC_EXTENSIONS)
+            cursor.execute("""
+                UPDATE id_applications
+                SET marksheet_path=%s, marksheet_display_path=NULL, marksheet_thumb_path=NULL
+                WHERE id=%s
+            """, (filename, app_id))
+            new_files["marksheet"] = filename
+
+        conn.commit()
+        if new_files:
+            queue_id_images(app_id, new_files)
+        return jsonify({"success": True})
+    except (RequestEntityTooLarge, UnsupportedMediaType) as e:
+        return jsonify({"success": False, "message": e.description}), e.code
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/get_verified_students', methods=['GET'])
+def get_verified_students():
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return jsonify({"error": "DB Busy"}), 503
+        
+        cursor = conn.cursor(dictionary=True)
+        query = "SELECT * FROM id_applications WHERE status = 'Approved' ORDER BY id DESC"
+        cursor.execute(query)
+        students = cursor.fetchall()
+        return jsonify(students)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if conn: conn.close()
+
+@app.route('/api/get_all_ids', methods=['GET'])
+def get_all_ids():
+    conn = None
+    try:
+        email = request.args.get('email')
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+        
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM id_applications WHERE email=%s ORDER BY academic_year DESC", (email,))
+        cards = cursor.fetchall()
+        return jsonify({"success": True, "cards": cards})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/rebuild_id_images', methods=['POST'])
+def rebuild_id_images():
+    """Purani applications (pipeline se pehle ki) ke liye variants queue karta hai."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT id, photo_path, signature_path, marksheet_path FROM id_applications
+            WHERE photo_thumb_path IS NULL OR signature_thumb_path IS NULL
+        """)
+        rows = cursor.fetchall()
+        for row in rows:
+            queue_id_images(row['id'], {"photo": row['photo_path'],
+                                        "signature": row['signature_path'],
+                                        "marksheet": row['marksheet_path']})
+        return jsonify({"success": True, "queued": len(rows)})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/gc_uploads', methods=['POST'])
+def gc_uploads():
+    try:
+        data = request.get_json(silent=True) or {}
+        report = collect_orphan_uploads(dry_run=data.get('dry_run', True))
+        if report is None: return jsonify({"success": False, "message": "DB Busy"}), 503
+        return jsonify({"success": True, **report})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+
+# --- BULK IMPORT ROUTES ---
+
+@app.route('/admin/import_bulk_marks', methods=['POST'])
+def import_bulk_marks():
+    if 'file' not in request.files:
+        return jsonify({"success": False, "message": "No file uploaded"})
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"success": False, "message": "No file selected"})
+
+    conn = None
+    try:
+        import pandas as pd
+        if file.filename.endswith('.csv'):
+            df = pd.read_csv(file)
+        else:
+            df = pd.read_excel(file, engine='openpyxl')
+
+        df.columns = [str(col).strip().upper() for col in df.columns]
+
+        required = ['ROLL_NO', 'SUBJECT', 'MARKS', 'TOTAL_MARKS']
+        if not all(col in df.columns for col in required):
+            return jsonify({
+                "success": False, 
+                "message": f"Columns missing! Headers must be: {', '.join(required)}"
+            })
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+        
+        cursor = conn.cursor(dictionary=True)
+        count = 0
+        imported_emails = set()
+
+        for index, row in df.iterrows():
+            roll_raw = str(row['ROLL_NO']).strip()
+            roll = roll_raw.split('.')[0] if '.' in roll_raw else roll_raw
+            
+            cursor.execute("SELECT email FROM users WHERE roll = %s", (roll,))
+            user = cursor.fetchone()
+            
+            if user:
+                sem = str(row.get('SEMESTER', 'N/A'))
+                cursor.execute('''
+                    INSERT INTO results (email, subject, marks, total_marks, semester)
+                    VALUES (%s, %s, %s, %s, %s)
+                ''', (user['email'], row['SUBJECT'], row['MARKS'], row['TOTAL_MARKS'], sem))
+                imported_emails.add(user['email'])
+                count += 1
+
+        refresh_result_summary(conn, imported_emails)
+
+        cursor.execute("INSERT INTO college_info (category, content) VALUES (%s, %s)", 
+                       (f"Document: {file.filename}", f"Bulk marks imported for {count} students."))
+        conn.commit()
+        invalidate_context()
+        return jsonify({"success": True, "count": count})
+
+    except Exception as e:
+        print(f"IMPORT ERROR: {str(e)}")
+        return jsonify({"success": False, "message": f"Read Error: {str(e)}"})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/clear_all_results_database', methods=['POST'])
+def clear_all_results_database():
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+        
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM results") 
+        cursor.execute("DELETE FROM result_summary")
+        cursor.execute("DELETE FROM course_summary")
+        conn.commit()
+        return jsonify({"success": True, "message": "All marks deleted successfully"})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+
+# --- ANALYTICS ROUTES ---
+
+@app.route('/admin/class_analytics', methods=['POST'])
+def class_analytics():
+    conn = None
+    try:
+        data = request.json
+        course = data.get('course', '').strip()
+        semester = data.get('semester', '').strip() or 'N/A'
+        top = min(int(data.get('top', 10)), 100)
+
+        if not course: return jsonify({"success": False, "message": "Course is required"}), 400
+
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT students, passed_students, avg_percentage, max_percentage, min_percentage, updated_at
+            FROM course_summary WHERE course=%s AND semester=%s
+        """, (course, semester))
+        summary = cursor.fetchone()
+        if not summary:
+            return jsonify({"success": False, "message": "No results found for this class."})
+
+        cursor.execute("""
+            SELECT * FROM (
+                SELECT u.name, u.roll, s.email, s.obtained, s.total, s.percentage,
+                       RANK() OVER (ORDER BY s.percentage DESC) AS rank_no,
+                       ROUND(PERCENT_RANK() OVER (ORDER BY s.percentage) * 100, 2) AS percentile
+                FROM result_summary s JOIN users u ON u.email = s.email
+                WHERE u.course=%s AND s.semester=%s
+            ) ranked ORDER BY rank_no LIMIT %s
+        """, (course, semester, top))
+        toppers = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT r.subject, COUNT(*) AS students, CAST(SUM(r.marks * 100 >= r.total_marks * %s) AS SIGNED) AS passed,
+                   CAST(ROUND(AVG(r.marks * 100 / NULLIF(r.total_marks, 0)), 2) AS DOUBLE) AS avg_percentage
+            FROM results r JOIN users u ON u.email = r.email
+            WHERE u.course=%s AND COALESCE(r.semester, 'N/A')=%s
+            GROUP BY r.subject ORDER BY r.subject
+        """, (PASS_PERCENTAGE, course, semester))
+        subjects = cursor.fetchall()
+        for row in subjects:
+            row['pass_rate'] = round(row['passed'] * 100 / row['students'], 2)
+
+        return jsonify({"success": True, "course": course, "semester": semester,
+                        "summary": summary, "toppers": toppers, "subjects": subjects})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+@app.route('/admin/recompute_result_summary', methods=['POST'])
+def recompute_result_summary():
+    conn = None
+    try:
+        conn = get_db_connection()
+        if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+
+        counts = recompute_all_summaries(conn)
+        return jsonify({"success": True, **counts})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)})
+    finally:
+        if conn: conn.close()
+
+# --- EXPORT ROUTES (streamed CSV / XLSX) ---
+EXPORT_BATCH_SIZE = 500
+EXPORT_FLUSH_BYTES = 64 * 1024
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+def iter_rows(conn, sql, params=()):
+    """Unbuffered cursor: MySQL se rows batch-wise aati hain, poora result memory mein nahi.
+    Pehla item header (column names) hota hai. Connection yahi band karta hai."""
+    cursor = None
+    try:
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(sql, params)
+        yield cursor.column_names
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows: break
+            yield from rows
+    finally:
+        try:
+            conn.consume_results()  # client beech mein disconnect ho to bache rows discard
+            if cursor: cursor.close()
+        finally:
+            conn.close()
+
+def csv_chunks(header, rows):
+    buffer = io.StringIO()
+    buffer.write("\ufeff")  # Excel ke liye UTF-8 BOM
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def xlsx_chunks(header, rows, title):
+    """openpyxl write-only mode: rows seedhe temp XML mein jaati hain, phir file chunks mein stream."""
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title)
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append(list(row))
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(EXPORT_FLUSH_BYTES)
+            if not chunk: break
+            yield chunk
+
+def export_response(sql, params, name):
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_MIMETYPES:
+        return jsonify({"success": False, "message": "Format must be csv or xlsx"}), 400
+
+    conn = get_db_connection()
+    if not conn: return jsonify({"success": False, "message": "DB Busy"}), 503
+
+    rows = iter_rows(conn, sql, params)
+    try:
+        header = next(rows)  # query yahin chalti hai; error ho to abhi JSON bhej sakte hain
+    except Exception as e:
+        rows.close()
+        return jsonify({"success": False, "message": str(e)}), 500
+
+    chunks = csv_chunks(header, rows) if fmt == 'csv' else xlsx_chunks(header, rows, name)
+    filename = f"COE_{name}_{time.strftime('%Y%m%d')}.{fmt}"
+    return app.response_class(stream_with_context(chunks), mimetype=EXPORT_MIMETYPES[fmt],
+                              headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+@app.route('/admin/export/results', methods=['GET'])
+def export_results():
+    sql = """
+        SELECT u.roll AS `Roll Number`, u.name AS `Student Name`, u.course AS `Course`,
+               COALESCE(r.semester, 'N/A') AS `Semester`, r.subject AS `Subject`,
+               r.marks AS `Marks`, r.total_marks AS `Total Marks`, u.email AS `Email ID`
+        FROM results r JOIN users u ON u.email = r.email
+    """
+    filters, params = [], []
+    if request.args.get('course'):
+        filters.append("u.course = %s")
+        params.append(request.args['course'])
+    if request.args.get('semester'):
+        filters.append("COALESCE(r.semester, 'N/A') = %s")
+        params.append(request.args['semester'])
+    if filters:
+        sql += " WHERE " + " AND ".join(filters)
+    sql += " ORDER BY r.email, r.id"
+    return export_response(sql, tuple(params), "Results")
+
+@app.route('/admin/export/users', methods=['GET'])
+def export_users():
+    sql = """
+        SELECT name AS `Student Name`, email AS `Email ID`, roll AS `Roll Number`, course AS `Course`,
+               phone AS `Phone Number`, dob AS `Date of Birth`, gender AS `Gender`,
+               attendance AS `Attendance (%)`, internal_grade AS `Grade`
+        FROM users ORDER BY email
+    """
+    return export_response(sql, (), "Students")
+
+@app.route('/admin/export/chat_history', methods=['GET'])
+def export_chat_history():
+    try:
+        end = datetime.strptime(request.args['to'], "%Y-%m-%d") if request.args.get('to') else datetime.now()
+        start = datetime.strptime(request.args['from'], "%Y-%m-%d") if request.args.get('from') else end - timedelta(days=30)
+    except ValueError:
+        return jsonify({"success": False, "message": "Dates must be YYYY-MM-DD"}), 400
+
+    sql = """
+        SELECT id AS `ID`, user_email AS `Email ID`, timestamp AS `Time`,
+               user_query AS `Question`, bot_response AS `Answer`
+        FROM chat_history
+        WHERE timestamp >= %s AND timestamp < %s
+    """
+    params = [start.date(), end.date() + timedelta(days=1)]
+    if request.args.get('email'):
+        sql += " AND user_email = %s"
+        params.append(request.args['email'])
+    sql += " ORDER BY id"
+    return export_response(sql, tuple(params), "Chat_History")
+
+# --- QUERY PROFILE ROUTES ---
+QUERY_REPORT_SORTS = ("total_ms", "avg_ms", "max_ms", "count", "slow")
+
+@app.route('/admin/slow_queries', methods=['GET'])
+def slow_queries():
+    sort = request.args.get('sort', 'total_ms')
+    if sort not in QUERY_REPORT_SORTS:
+        return jsonify({"success": False, "message": f"sort must be one of: {', '.join(QUERY_REPORT_SORTS)}"}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), QUERY_STATS_MAX)
+    return jsonify({
+        "enabled": QUERY_PROFILING, "slow_query_ms": SLOW_QUERY_MS, "pid": os.getpid(),
+        "since": query_stats_since, "statements": len(query_stats),
+        "queries": slow_query_report(limit, sort),
+    })
+
+@app.route('/admin/reset_query_stats', methods=['POST'])
+def reset_query_stats():
+    global query_stats_since
+    with query_stats_lock:
+        query_stats.clear()
+        query_stats_since = datetime.now()
+    return jsonify({"success": True})
+
+# --- CHAT HISTORY RETENTION ---
+CHAT_RETENTION_DAYS = int(os.getenv("CHAT_RETENTION_DAYS", 365))          # 0 = hamesha rakho
+CHAT_ARCHIVE_BATCH = int(os.getenv("CHAT_ARCHIVE_BATCH", 1000))
+CHAT_ARCHIVE_INTERVAL_HOURS = float(os.getenv("CHAT_ARCHIVE_INTERVAL_HOURS", 0))  # 0 = scheduler off
+CHAT_ARCHIVE_PAUSE = 0.1   # batches ke beech, taaki /ask ke inserts block na hon
+CHAT_TABLES = ("chat_history", "chat_history_archive")
+
+def _chat_retention_scopes(cursor):
+    """(WHERE clause, params) list: global retention + har user ki apni policy (index-friendly ranges)."""
+    now = datetime.now()
+    scopes = []
+    if CHAT_RETENTION_DAYS > 0:
+        scopes.append(("timestamp < %s AND NOT EXISTS (SELECT 1 FROM chat_retention_policy p WHERE p.user_email = h.user_email)",
+                       (now - timedelta(days=CHAT_RETENTION_DAYS),)))
+    cursor.execute("SELECT user_email, retention_days FROM chat_retention_policy WHERE retention_days > 0")
+    for email, days in cursor.fetchall():
+        scopes.append(("user_email = %s AND timestamp < %s", (email, now - timedelta(days=days))))
+    return scopes
+
+ARCHIVE_LOCKED = -1 # Doosra worker / CLI pehle se archive chala raha hai
+
+def archive_chat_history(batch_size=CHAT_ARCHIVE_BATCH, dry_run=False):
+    """Retention se purani rows chat_history_archive (compressed) mein batch-wise move karta hai.
+    Har batch alag transaction hai. Return: moved (ya dry run mein eligible) rows,
+    ARCHIVE_LOCKED agar koi aur archive chala raha hai, None agar DB nahi mila."""
+    conn = get_db_connection()
+    if not conn: return None
+
+    moved = 0
+    try:
+        cursor = conn.cursor()
+        if not dry_run:
+            # Multi-worker deployment mein ek hi process archive kare
+            cursor.execute("SELECT GET_LOCK('coe_chat_archive', 0)")
+            if not cursor.fetchone()[0]: return ARCHIVE_LOCKED
+        for where, params in _chat_retention_scopes(cursor):
+            if dry_run:
+                cursor.execute(f"SELECT COUNT(*) FROM chat_history h WHERE {where}", params)
+                moved += cursor.fetchone()[0]
+                continue
+
+            while True:
+                cursor.execute(f"SELECT id FROM chat_history h WHERE {where} ORDER BY id LIMIT %s", (*params, batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids: break
+
+                placeholders = ", ".join(["%s"] * len(ids))
+                cursor.execute(f"""
+                    INSERT INTO chat_history_archive (id, user_email, user_query, bot_response, timestamp)
+                    SELECT id, user_email, user_query, bot_response, timestamp FROM chat_history WHERE id IN ({placeholders})
+                """, tuple(ids))
+                cursor.execute(f"DELETE FROM chat_history WHERE id IN ({placeholders})", tuple(ids))
+                conn.commit()
+                moved += len(ids)
+                time.sleep(CHAT_ARCHIVE_PAUSE)
+        if not dry_run:
+            cursor.execute("SELECT RELEASE_LOCK('coe_chat_archive')")
+            cursor.fetchone()
+        return moved
+    finally:
+        conn.close()
+
+def chat_table_stats():
+    """chat tables ki exact row count + on-disk size (information_schema)."""
+    conn = get_db_connection()
+    if not conn: return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT table_name, data_length, index_length FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name IN ({", ".join(["%s"] * len(CHAT_TABLES))})
+        """, CHAT_TABLES)
+        sizes = {name: (data or 0) + (index or 0) for name, data, index in cursor.fetchall()}
+
+        stats = {}
+        for table in CHAT_TABLES:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            stats[table] = {"rows": cursor.fetchone()[0], "size_mb": round(sizes.get(table, 0) / (1024 * 1024), 2)}
+        return stats
+    finally:
+        conn.close()
+
+def _print_chat_stats(label, stats):
+    print(label)
+    for table, info in (stats or {}).items():
+        print(f"  {table:<22} {info['rows']:>10,} rows  {info['size_mb']:>9.2f} MB")
+
+def _month_start(value, offset=0):
+    month = value.year * 12 + value.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1)
+
+def chat_partition_ddl(cursor, months_ahead=3):
+    """chat_history ko month-wise RANGE partitions mein convert / extend karne ka SQL."""
+    cursor.execute("""
+        SELECT partition_name FROM information_schema.partitions
+        WHERE table_schema = DATABASE() AND table_name = 'chat_history' AND partition_name IS NOT NULL
+    """)
+    existing = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SELECT MIN(timestamp) FROM chat_history")
+    oldest = cursor.fetchone()[0] or datetime.now()
+
+    last = _month_start(datetime.now(), months_ahead)
+    months, current = [], _month_start(oldest)
+    while current <= last:
+        months.append(current)
+        current = _month_start(current, 1)
+
+    def partition(month):
+        bound = _month_start(month, 1).strftime('%Y-%m-%d')
+        return f"PARTITION p{month:%Y%m} VALUES LESS THAN (UNIX_TIMESTAMP('{bound}'))"
+
+    if not existing:
+        # Partition key har unique key mein hona chahiye, isliye PK (id, timestamp)
+        parts = ",\n    ".join([partition(m) for m in months] + ["PARTITION pmax VALUES LESS THAN MAXVALUE"])
+        return [
+            # NOT NULL se pehle purani NULL timestamp rows bharo, warna MODIFY fail hota hai
+            "UPDATE chat_history SET `timestamp` = CURRENT_TIMESTAMP WHERE `timestamp` IS NULL",
+            "ALTER TABLE chat_history MODIFY `timestamp` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+            "DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `timestamp`)",
+            f"ALTER TABLE chat_history PARTITION BY RANGE (UNIX_TIMESTAMP(`timestamp`)) (\n    {parts}\n)",
+        ]
+
+    # pmax ke upar hi naye months jud sakte hain
+    latest = max((name for name in existing if name != 'pmax'), default="p000000")
+    missing = [m for m in months if f"p{m:%Y%m}" > latest]
+    if not missing: return []
+    parts = ",\n    ".join([partition(m) for m in missing] + ["PARTITION pmax VALUES LESS THAN MAXVALUE"])
+    return [f"ALTER TABLE chat_history REORGANIZE PARTITION pmax INTO (\n    {parts}\n)"]
+
+@app.cli.command('chat-stats')
+def chat_stats_command():
+    """chat_history / archive ka size aur row count."""
+    _print_chat_stats("Chat tables:", chat_table_stats())
+
+@app.cli.command('archive-chat')
+@click.option('--batch-size', default=CHAT_ARCHIVE_BATCH, show_default=True)
+@click.option('--dry-run', is_flag=True, help="Sirf eligible rows count karo.")
+def archive_chat_command(batch_size, dry_run):
+    """Retention se purani chat history archive table mein move karo."""
+    stats = chat_table_stats()
+    if stats is None: raise click.ClickException("DB Busy")
+    _print_chat_stats("Before:", stats)
+    moved = archive_chat_history(batch_size=batch_size, dry_run=dry_run)
+    if moved is None: raise click.ClickException("DB Busy")
+    if moved == ARCHIVE_LOCKED: raise click.ClickException("Archive already running (doosre process ke paas lock hai)")
+    print(f"{'Eligible' if dry_run else 'Archived'} rows: {moved}")
+    if not dry_run:
+        _print_chat_stats("After:", chat_table_stats())
+
+@app.cli.command('set-chat-retention')
+@click.argument('email')
+@click.argument('days', type=int)
+def set_chat_retention_command(email, days):
+    """User-specific retention (days=0: kabhi archive mat karo, days<0: policy hatao)."""
+    conn = get_db_connection()
+    if not conn: raise click.ClickException("DB Busy")
+    try:
+        cursor = conn.cursor()
+        if days < 0:
+            cursor.execute("DELETE FROM chat_retention_policy WHERE user_email=%s", (email,))
+        else:
+            cursor.execute("""
+                INSERT INTO chat_retention_policy (user_email, retention_days) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE retention_days = VALUES(retention_days)
+            """, (email, days))
+        conn.commit()
+        print(f"Retention for {email}: {'global default' if days < 0 else f'{days} days'}")
+    finally:
+        conn.close()
+
+@app.cli.command('partition-chat')
+@click.option('--months-ahead', default=3, show_default=True)
+@click.option('--dry-run', is_flag=True, help="Sirf SQL print karo.")
+def partition_chat_command(months_ahead, dry_run):
+    """chat_history ko monthly RANGE partitions mein convert karo / aage ke months add karo."""
+    conn = get_db_connection()
+    if not conn: raise click.ClickException("DB Busy")
+    try:
+        cursor = conn.cursor()
+        statements = chat_partition_ddl(cursor, months_ahead)
+        if not statements:
+            print("Partitions already up to date.")
+        for sql in statements:
+            print(sql + ";")
+            if not dry_run:
+                cursor.execute(sql)
+                conn.commit()
+    finally:
+        conn.close()
+
+def _chat_archive_scheduler():
+    while True:
+        time.sleep(CHAT_ARCHIVE_INTERVAL_HOURS * 3600)
+        try:
+            moved = archive_chat_history()
+            if moved == ARCHIVE_LOCKED:
+                print("Chat Archive: already running elsewhere, skipped")
+            else:
+                print(f"Chat Archive: {moved} rows moved")
+        except Exception as e:
+            print(f"Chat Archive Error: {e}")
+
+_scheduler_pid = None
+
+@app.before_request
+def start_background_jobs():
+    # Threads fork ke baad copy nahi hote, isliye har worker process apna scheduler pehli request par start kare
+    global _scheduler_pid
+    if CHAT_ARCHIVE_INTERVAL_HOURS > 0 and _scheduler_pid != os.getpid():
+        _scheduler_pid = os.getpid()
+        threading.Thread(target=_chat_archive_scheduler, name="chat-archive", daemon=True).start()
+
+# --- WARMUP & READINESS ---
+# Traffic lene se pehle caches bharo aur InnoDB buffer pool mein hot indexes le aao
+HOT_INDEX_QUERIES = (
+    "SELECT COUNT(*) FROM users",
+    "SELECT COUNT(*) FROM users FORCE INDEX (roll_course)",
+    "SELECT COUNT(*) FROM results FORCE INDEX (email)",
+    "SELECT COUNT(*) FROM result_summary",
+    "SELECT COUNT(*) FROM id_applications FORCE INDEX (email)",
+    "SELECT COUNT(*) FROM chat_history FORCE INDEX (user_time)",
+)
+WARMUP_USERS = int(os.getenv("WARMUP_USERS", 500))
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", 15))
+
+warmup_state = {"ready": False, "started_at": None, "finished_at": None, "steps": {}}
+
+def warm_indexes():
+    conn = get_db_connection()
+    if not conn: raise DBUnavailable()
+    try:
+        cursor = conn.cursor()
+        for sql in HOT_INDEX_QUERIES:
+            cursor.execute(sql)
+            cursor.fetchall()
+        return len(HOT_INDEX_QUERIES)
+    finally:
+        conn.close()
+
+def preload_users(limit=WARMUP_USERS):
+    """Haal hi mein active users (chat history se) ko LRU mein daalo."""
+    conn = get_db_connection()
+    if not conn: raise DBUnavailable()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT user_email FROM chat_history WHERE timestamp > %s AND user_email IS NOT NULL
+            GROUP BY user_email ORDER BY MAX(timestamp) DESC LIMIT %s
+        """, (datetime.now() - timedelta(days=7), limit))
+        emails = [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+    return sum(1 for email in emails if get_user_record(email))
+
+_warmup_pid = None
+_warmup_lock = threading.Lock()
+
+def warmup():
+    """Startup warmup; har step ka time / error warmup_state mein (/ready par dikhta hai).
+    ready tabhi True jab saare DB wale steps chal gaye; shared_cache purge optional hai."""
+    with _warmup_lock:
+        warmup_state.update(ready=False, started_at=datetime.now(), finished_at=None, steps={})
+    steps = (
+        ("shared_cache", shared_cache.purge_expired, False),
+        ("knowledge_context", lambda: len(load_full_context()), True),
+        ("timetable", lambda: len(load_timetable(refresh=True)), True),
+        ("hot_indexes", warm_indexes, True),
+        ("user_cache", preload_users, True),
+    )
+    ok = True
+    for name, step, required in steps:
+        t0 = time.perf_counter()
+        try:
+            result = {"ok": True, "value": step()}
+        except Exception as e:
+            result = {"ok": False, "error": str(e) or type(e).__name__}
+        result["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        with _warmup_lock:
+            warmup_state["steps"][name] = result
+        print(f"Warmup {name}: {result}")
+        ok = ok and (result["ok"] or not required)
+    with _warmup_lock:
+        warmup_state.update(ready=ok, finished_at=datetime.now())
+    return warmup_snapshot()
+
+def warmup_snapshot():
+    # warmup thread beech mein steps badal sakta hai, isliye lock ke andar copy banao
+    with _warmup_lock:
+        return {**warmup_state, "steps": {name: dict(r) for name, r in warmup_state["steps"].items()}}
+
+def _warmup_until_ready():
+    while not warmup()["ready"]:
+        time.sleep(WARMUP_RETRY_SECONDS)
+
+def start_warmup():
+    """Background warmup, ready hone tak retry. Har process mein ek hi thread (gunicorn post_fork
+    se bhi call hota hai: master ka warmup fail hua ho to worker khud dobara try kare)."""
+    global _warmup_pid
+    with _warmup_lock:
+        if warmup_state["ready"] or _warmup_pid == os.getpid(): return
+        _warmup_pid = os.getpid()
+    threading.Thread(target=_warmup_until_ready, name="warmup", daemon=True).start()
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    # Load balancer / health check: warmup khatam hone tak 503
+    state = warmup_snapshot()
+    return jsonify(state), 200 if state["ready"] else 503
+
+if __name__ == '__main__':
+    start_warmup()
     app.run(port=5000, debug=True, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Admin JSON payload benchmark (3000 students, jaisa college_info mein likha hai).
+
+Flask ke default JSON provider vs FastJSONProvider ka serialization time,
+aur raw / gzip / brotli bytes on the wire compare karta hai.
+
+Usage:  python bench_payloads.py [students]
+"""
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+
+from flask.json.provider import DefaultJSONProvider
+
+import app as coe
+
+STUDENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+ROUNDS = 20
+COURSES = ["BCA", "BA", "B.Sc", "B.Com", "B.Voc"]
+
+
+def fake_users(n):
+    # Same columns as admin_get_users
+    return [{
+        "name": f"Student {i}", "email": f"student{i}@gcsanjauli.edu.in",
+        "roll": f"{20250000 + i}", "course": random.choice(COURSES),
+        "phone": f"98160{i:05d}", "dob": "2005-06-15",
+        "attendance": str(random.randint(40, 100)), "internal_grade": random.choice("ABCD"),
+    } for i in range(n)]
+
+
+def fake_verified(n):
+    # SELECT * FROM id_applications (get_verified_students) - created_at datetime hai
+    start = datetime(2025, 7, 1)
+    return [{
+        "id": i, "email": f"student{i}@gcsanjauli.edu.in", "full_name": f"Student {i}",
+        "gender": "F" if i % 2 else "M", "father_name": f"Father {i}", "mother_name": f"Mother {i}",
+        "roll_no": f"{20250000 + i}", "department": random.choice(COURSES), "academic_year": "2025-26",
+        "phone": f"98160{i:05d}", "photo_path": f"{i:064x}.jpg", "signature_path": f"{i + 1:064x}.png",
+        "marksheet_path": f"{i + 2:064x}.pdf", "photo_thumb_path": f"{i:064x}_thumb.jpg",
+        "status": "Approved", "unique_id": f"COE-{i:06X}", "created_at": start + timedelta(minutes=i),
+    } for i in range(n)]
+
+
+def bench(provider, payload):
+    best = float("inf")
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        body = provider.dumps(payload, separators=(",", ":"))
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, body.encode()
+
+
+def main():
+    random.seed(7)
+    payloads = {"admin/get_users": fake_users(STUDENTS),
+                "admin/get_verified_students": fake_verified(STUDENTS)}
+    providers = {"flask default": DefaultJSONProvider(coe.app),
+                 "fast provider": coe.FastJSONProvider(coe.app)}
+
+    print(f"{STUDENTS} students, best of {ROUNDS} rounds (orjson: {'yes' if coe.orjson else 'no'})\n")
+    for route, payload in payloads.items():
+        print(route)
+        for label, provider in providers.items():
+            ms, raw = bench(provider, payload)
+            print(f"  {label:<14} {ms:8.2f} ms  {len(raw):>9,} bytes")
+
+        for encoding in (["gzip", "br"] if coe.brotli else ["gzip"]):
+            t0 = time.perf_counter()
+            size = len(coe.compress_body(raw, encoding))
+            ms = (time.perf_counter() - t0) * 1000
+            print(f"  {encoding:<14} {ms:8.2f} ms  {size:>9,} bytes  ({size / len(raw):.1%})")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Startup time report: `import app` ka import-time breakdown (python -X importtime).
+
+app ke direct imports ka cumulative time, app module ki apni body, aur check ki
+lazy rakhi gayi heavy libraries import time par load to nahi ho rahi.
+
+Usage:  python bench_startup.py [--top 15] [--budget-ms 1500]
+Budget cross ho ya koi lazy module load ho jaye to exit code 1 (regression check).
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+LAZY_MODULES = ("pandas", "openpyxl", "PyPDF2", "groq")
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_import():
+    code = f"import sys, app; print('LAZY:' + ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=HERE, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+    if proc.returncode:
+        sys.exit(proc.stderr)
+    marker = [line for line in proc.stdout.splitlines() if line.startswith("LAZY:")][-1]
+    return wall_ms, proc.stderr, [m for m in marker[5:].split(",") if m]
+
+
+def app_breakdown(report):
+    """-X importtime post-order likhta hai: children pehle, phir parent. (name, self_us, cumulative_us)"""
+    children, pending = [], []
+    app_self = app_total = 0
+    for line in report.splitlines():
+        match = LINE_RE.match(line)
+        if not match: continue
+        self_us, total_us, indent, name = int(match[1]), int(match[2]), len(match[3]), match[4]
+        level = (indent - 1) // 2
+        if level == 1:
+            pending.append((name, self_us, total_us))
+        elif level == 0:
+            if name == "app":
+                children, app_self, app_total = pending, self_us, total_us
+            pending = []
+    return children, app_self, app_total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None, help="import app ke liye max cumulative ms")
+    args = parser.parse_args()
+
+    wall_ms, report, lazy_loaded = run_import()
+    children, app_self, app_total = app_breakdown(report)
+
+    print(f"import app: {app_total / 1000:8.1f} ms  (process wall time {wall_ms:.0f} ms)\n")
+    print(f"  {'module':<32} {'cumulative':>12} {'share':>7}")
+    for name, _, total_us in sorted(children, key=lambda c: -c[2])[:args.top]:
+        print(f"  {name:<32} {total_us / 1000:9.1f} ms {total_us / max(app_total, 1):7.1%}")
+    print(f"  {'app (module body)':<32} {app_self / 1000:9.1f} ms {app_self / max(app_total, 1):7.1%}")
+    print(f"\nLazy modules loaded at import: {', '.join(lazy_loaded) or 'none'}")
+
+    failed = bool(lazy_loaded)
+    if args.budget_ms is not None and app_total / 1000 > args.budget_ms:
+        print(f"Over budget: {app_total / 1000:.1f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Production launcher: gunicorn ke N worker processes, app master mein preload.
+
+Master import + warmup karta hai (shared cache, InnoDB indexes, user LRU), phir fork.
+Har worker fork ke baad apna MySQL pool banata hai. /ready warmup (DB steps) safal hone ke baad 200 deta hai.
+Windows / gunicorn na ho to single process (threaded) fallback.
+
+Usage:  python serve.py [--workers 4] [--threads 4] [--bind 0.0.0.0:5000]
+"""
+import os
+import sys
+import argparse
+
+import app as coe
+
+
+def post_fork(server, worker):
+    coe.reset_db_pool()
+    coe.start_warmup()  # master ka warmup fail hua (DB down) to worker ready hone tak retry karega
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class COEApplication(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": args.bind,
+                "workers": args.workers,
+                "threads": args.threads,
+                "worker_class": "gthread",
+                "preload_app": True,
+                "timeout": 120,  # Groq / bulk import wali requests lambi ho sakti hain
+                "post_fork": post_fork,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            coe.warmup()
+            coe.close_db_pool()  # master ke connections workers mein inherit na hon
+            return coe.app
+
+    COEApplication().run()
+
+
+def run_single(args):
+    host, _, port = args.bind.rpartition(":")
+    coe.start_warmup()
+    coe.app.run(host=host or "0.0.0.0", port=int(port), threaded=True, use_reloader=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    # Har worker ka pool 20 connections ka hai: workers * 20 < MySQL max_connections rakho
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 4)))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", 4)))
+    parser.add_argument("--bind", default=os.getenv("BIND", "0.0.0.0:5000"))
+    args = parser.parse_args()
+
+    # Bina SECRET_KEY har worker ka random key hoga: ek worker ka token doosre par invalid
+    if not os.getenv("SECRET_KEY"):
+        sys.exit("SECRET_KEY is not set (.env). Refusing to start: login tokens must be valid across workers and restarts.")
+
+    try:
+        if sys.platform == "win32": raise ImportError("gunicorn Windows par nahi chalta")
+        import gunicorn  # noqa: F401
+    except ImportError as e:
+        print(f"Multi-process mode unavailable ({e}), single process mein chal raha hai")
+        return run_single(args)
+    run_gunicorn(args)
+
+
+if __name__ == '__main__':
+    main()
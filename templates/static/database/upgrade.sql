@@ -0,0 +1,77 @@
+-- UPGRADE FOR AN EXISTING COE ASSISTANT DATABASE
+-- mysql.sql tables DROP karke dobara banata hai (saara data chala jayega).
+-- Purane database par yeh file ek baar chalao: sirf naye columns, indexes aur tables add hote hain.
+-- Note: unique_id par UNIQUE key se pehle duplicate unique_id values theek kar lo.
+
+-- 1. chat_history: per-user history aur retention scans ke indexes
+ALTER TABLE `chat_history`
+  ADD KEY `user_time` (`user_email`,`timestamp`),
+  ADD KEY `timestamp` (`timestamp`);
+
+-- 2. college_info: uploaded knowledge file ka content-addressed naam (duplicate check)
+ALTER TABLE `college_info`
+  ADD COLUMN `source_file` varchar(255) DEFAULT NULL AFTER `content`,
+  ADD KEY `source_file` (`source_file`);
+-- Purane uploads 'Document: <file name>' category ke saath save hote the (file ka naam wahi tha)
+UPDATE `college_info` SET `source_file` = SUBSTRING(`category`, 11)
+WHERE `source_file` IS NULL AND `category` LIKE 'Document: %';
+
+-- 3. users: roll / course lookups (bulk import, forgot_userid)
+ALTER TABLE `users`
+  ADD KEY `roll_course` (`roll`,`course`);
+
+-- 4. id_applications: resized image variants + unique ID card numbers
+ALTER TABLE `id_applications`
+  ADD COLUMN `photo_display_path` varchar(255) DEFAULT NULL AFTER `marksheet_path`,
+  ADD COLUMN `photo_thumb_path` varchar(255) DEFAULT NULL AFTER `photo_display_path`,
+  ADD COLUMN `signature_display_path` varchar(255) DEFAULT NULL AFTER `photo_thumb_path`,
+  ADD COLUMN `signature_thumb_path` varchar(255) DEFAULT NULL AFTER `signature_display_path`,
+  ADD COLUMN `marksheet_display_path` varchar(255) DEFAULT NULL AFTER `signature_thumb_path`,
+  ADD COLUMN `marksheet_thumb_path` varchar(255) DEFAULT NULL AFTER `marksheet_display_path`,
+  ADD UNIQUE KEY `unique_id` (`unique_id`);
+
+-- 5. New tables (data nahi hota, IF NOT EXISTS se safe)
+CREATE TABLE IF NOT EXISTS `result_summary` (
+  `email` varchar(255) NOT NULL,
+  `semester` varchar(50) NOT NULL DEFAULT 'N/A',
+  `subjects` int NOT NULL DEFAULT '0',
+  `passed_subjects` int NOT NULL DEFAULT '0',
+  `obtained` int NOT NULL DEFAULT '0',
+  `total` int NOT NULL DEFAULT '0',
+  `percentage` double NOT NULL DEFAULT '0',
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`email`,`semester`),
+  KEY `semester_percentage` (`semester`,`percentage`),
+  CONSTRAINT `result_summary_ibfk_1` FOREIGN KEY (`email`) REFERENCES `users` (`email`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `course_summary` (
+  `course` varchar(100) NOT NULL,
+  `semester` varchar(50) NOT NULL,
+  `students` int NOT NULL DEFAULT '0',
+  `passed_students` int NOT NULL DEFAULT '0',
+  `avg_percentage` double NOT NULL DEFAULT '0',
+  `max_percentage` double NOT NULL DEFAULT '0',
+  `min_percentage` double NOT NULL DEFAULT '0',
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`course`,`semester`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE IF NOT EXISTS `chat_history_archive` (
+  `id` int NOT NULL,
+  `user_email` varchar(255) DEFAULT NULL,
+  `user_query` text,
+  `bot_response` text,
+  `timestamp` timestamp NULL DEFAULT NULL,
+  `archived_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`),
+  KEY `user_time` (`user_email`,`timestamp`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8;
+
+CREATE TABLE IF NOT EXISTS `chat_retention_policy` (
+  `user_email` varchar(255) NOT NULL,
+  `retention_days` int NOT NULL,
+  PRIMARY KEY (`user_email`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- 6. Existing results se summaries bharo: `POST /admin/recompute_result_summary`